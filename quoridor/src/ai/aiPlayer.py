@@ -1,6 +1,13 @@
+import threading
 from abc import ABC, abstractmethod
 from enum import Enum
 
+from game.board import cell_index, slot_wall, wall_slot
+from util.constants import BOARD_SIZE
+
+# Move codes: cell index for pawn moves, PAWN_CODES + wall slot for walls
+PAWN_CODES = BOARD_SIZE * BOARD_SIZE
+
 
 class MoveType(Enum):
     PAWN = "pawn"
@@ -23,9 +30,44 @@ class AIMove:
             self.y = y
             self.is_horizontal = is_horizontal
 
+    @property
+    def code(self):
+        if self.type == MoveType.PAWN:
+            return cell_index(self.x, self.y)
+        return PAWN_CODES + wall_slot(self.x, self.y, self.is_horizontal)
+
+    @classmethod
+    def from_code(cls, code):
+        if code < PAWN_CODES:
+            return cls(code % BOARD_SIZE, code // BOARD_SIZE)
+        return cls(*slot_wall(code - PAWN_CODES))
+
 
 class AIPlayer(ABC):
     #Abstract base class for AI players.
+    _cancel_event = None
+    
     @abstractmethod
     def get_move(self, game_state):
         pass
+    
+    # Think about the position on the opponent's turn; engines that support it
+    # return the predicted reply. Meant to run on a thread and be cancelled.
+    def ponder(self, game_state):
+        return None
+    
+    # For get_move running on another thread: call before starting it, then cancel()
+    # makes a long search return early with the best move found so far
+    def prepare_cancel(self):
+        self._cancel_event = threading.Event()
+    
+    def cancel(self):
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+    
+    def is_cancelled(self):
+        return self._cancel_event is not None and self._cancel_event.is_set()
+    
+    # Release any resources held between moves (worker processes, caches)
+    def close(self):
+        pass
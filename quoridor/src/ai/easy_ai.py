@@ -1,6 +1,7 @@
 import random
 from ai.aiPlayer import AIPlayer, AIMove
-from game.pathFinding import has_valid_path
+from ai.searchState import SearchState
+from game.pathFinding import wall_keeps_paths_open
 from util.constants import BOARD_SIZE
 
 
@@ -10,22 +11,23 @@ class EasyAI(AIPlayer):
         self.player_id = player_id
     
     def get_move(self, game_state):
-        player = game_state.players[self.player_id]
+        state = SearchState.from_game_state(game_state)
+        player = state.players[self.player_id]
 
         # 30% chance to place a wall if available
         if player.walls_remaining > 0 and random.random() < 0.3:
-            wall_move = self._try_random_wall(game_state)
+            wall_move = self._try_random_wall(state)
             if wall_move:
                 return wall_move
         
         # Move pawn
-        valid_moves = game_state.get_valid_moves(player)
+        valid_moves = state.get_valid_moves(player)
         if valid_moves:
             move = random.choice(valid_moves)
             return AIMove(move.x, move.y)
         
         # Fallback: try wall again
-        wall_move = self._try_random_wall(game_state)
+        wall_move = self._try_random_wall(state)
         if wall_move:
             return wall_move
         
@@ -36,8 +38,8 @@ class EasyAI(AIPlayer):
         
         return None
     
-    def _try_random_wall(self, game_state):
-        player = game_state.players[self.player_id]
+    def _try_random_wall(self, state):
+        player = state.players[self.player_id]
         
         if player.walls_remaining <= 0:
             return None
@@ -48,21 +50,9 @@ class EasyAI(AIPlayer):
             y = random.randint(0, BOARD_SIZE - 2)
             is_horizontal = random.choice([True, False])
             
-            if game_state.board.can_place_wall(x, y, is_horizontal):
-                # Temporarily place wall
-                game_state.board.place_wall(x, y, is_horizontal)
-                
+            if state.board.can_place_wall(x, y, is_horizontal):
                 # Check if both players have valid paths
-                valid = True
-                for p in game_state.players:
-                    if not has_valid_path(game_state.board, p.x, p.y, p.goals):
-                        valid = False
-                        break
-                
-                # Remove temporary wall
-                game_state.board.remove_wall(x, y, is_horizontal)
-                
-                if valid:
+                if wall_keeps_paths_open(state.board, state.players, x, y, is_horizontal):
                     return AIMove(x, y, is_horizontal)
         
         return None
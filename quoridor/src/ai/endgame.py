@@ -0,0 +1,147 @@
+from collections import OrderedDict
+
+from game.board import WALL_CONFLICTS, WALL_SLOTS, cell_index
+from game.gameState import valid_pawn_cells
+from util.constants import BOARD_SIZE, PLAYER_GOALS
+
+CELL_COUNT = BOARD_SIZE * BOARD_SIZE
+# Race states: both pawn cells and the side to move
+STATE_COUNT = CELL_COUNT * CELL_COUNT * 2
+
+# Race outcomes for the side to move
+UNKNOWN = 0
+WIN = 1
+LOSS = 2
+
+# Solved tables kept, keyed by wall mask; walls are fixed once a race starts
+RACE_TABLES = 8
+
+
+def _state(cells, side):
+    return (cells[0] * CELL_COUNT + cells[1]) * 2 + side
+
+
+# True when no more walls can be placed, so the rest of the game is a pawn race.
+# Walls that cannot change either current shortest path do not qualify: they can
+# still lengthen a path once the pawns have moved, or block a jump, so treating
+# those positions as races would make the oracle's results inexact.
+def is_pure_race(state):
+    walls = state.board.walls
+    for player in state.players:
+        if player.walls_remaining > 0:
+            if any(not walls & WALL_CONFLICTS[slot] for slot in range(WALL_SLOTS)):
+                return False
+    return True
+
+
+class RaceTable:
+    # Exact outcome of every pawn race on one wall layout, by retrograde analysis.
+    # results[state] is WIN, LOSS or UNKNOWN (a draw by repetition or no legal move);
+    # plies[state] is the number of moves to the end under best play.
+
+    def __init__(self, neighbors):
+        self.neighbors = neighbors
+        self.results = bytearray(STATE_COUNT)
+        self.plies = [0] * STATE_COUNT
+        self._solve()
+
+    def moves(self, cells, side):
+        return valid_pawn_cells(self.neighbors, cells[side], cells[1 - side])
+
+    def _solve(self):
+        goal_rows = [range(goal * BOARD_SIZE, (goal + 1) * BOARD_SIZE) for goal in PLAYER_GOALS]
+        results = self.results
+        plies = self.plies
+        unresolved = [0] * STATE_COUNT
+        parents = [[] for _ in range(STATE_COUNT)]
+        frontier = []
+
+        for first in range(CELL_COUNT):
+            for second in range(CELL_COUNT):
+                if first == second:
+                    continue
+                cells = (first, second)
+                finished = [cells[player] in goal_rows[player] for player in (0, 1)]
+                for side in (0, 1):
+                    state = _state(cells, side)
+                    if finished[0] or finished[1]:
+                        # The game ended on the previous move, so the side to move lost
+                        if finished[1 - side] and not finished[side]:
+                            results[state] = LOSS
+                            frontier.append(state)
+                        continue
+                    moves = self.moves(cells, side)
+                    unresolved[state] = len(moves)
+                    for cell in moves:
+                        child = (cell, second) if side == 0 else (first, cell)
+                        parents[_state(child, 1 - side)].append(state)
+
+        # Walk back from finished games in order of game length
+        while frontier:
+            next_frontier = []
+            for state in frontier:
+                distance = plies[state] + 1
+                lost = results[state] == LOSS
+                for parent in parents[state]:
+                    if results[parent] != UNKNOWN:
+                        continue
+                    if lost:
+                        results[parent] = WIN
+                        plies[parent] = distance
+                        next_frontier.append(parent)
+                    else:
+                        unresolved[parent] -= 1
+                        if not unresolved[parent]:
+                            results[parent] = LOSS
+                            plies[parent] = distance
+                            next_frontier.append(parent)
+            frontier = next_frontier
+
+    # (result, plies, best move cell) for the side to move, or None if undecided
+    def solve(self, cells, side):
+        state = _state(cells, side)
+        result = self.results[state]
+        if result == UNKNOWN:
+            return None
+
+        best_cell = None
+        best_plies = None
+        for cell in self.moves(cells, side):
+            child = (cell, cells[1]) if side == 0 else (cells[0], cell)
+            child_state = _state(child, 1 - side)
+            if result == WIN:
+                # Fastest move into a lost position for the opponent
+                if self.results[child_state] == LOSS and (best_plies is None or self.plies[child_state] < best_plies):
+                    best_cell, best_plies = cell, self.plies[child_state]
+            elif best_plies is None or self.plies[child_state] > best_plies:
+                # Longest resistance
+                best_cell, best_plies = cell, self.plies[child_state]
+        return result, self.plies[state], best_cell
+
+
+_TABLES = OrderedDict()
+
+
+def has_race_table(walls):
+    return walls in _TABLES
+
+
+# Exact race result for the side to move, or None when it is not a pure race, it is
+# undecided, or (with build False) no table has been solved for these walls yet
+def solve_race(state, build=True):
+    if state.winner is not None or not is_pure_race(state):
+        return None
+
+    walls = state.board.walls
+    table = _TABLES.get(walls)
+    if table is None:
+        if not build:
+            return None
+        table = _TABLES[walls] = RaceTable([list(cells) for cells in state.board.neighbors])
+        while len(_TABLES) > RACE_TABLES:
+            _TABLES.popitem(last=False)
+    else:
+        _TABLES.move_to_end(walls)
+
+    cells = tuple(cell_index(p.x, p.y) for p in state.players)
+    return table.solve(cells, state.current_player_idx)
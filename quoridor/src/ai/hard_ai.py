@@ -1,153 +1,604 @@
-from ai.aiPlayer import AIPlayer, AIMove
-from game.pathFinding import find_shortest_path, has_valid_path
-from util.constants import BOARD_SIZE
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-# Hard AI using Minimax with Alpha-Beta Pruning
+from ai.aiPlayer import PAWN_CODES, AIPlayer, AIMove
+from ai.transpositionTable import (
+    EXACT, LOWER, NO_MOVE, UPPER, SharedTranspositionTable, TranspositionTable
+)
+from ai.endgame import WIN, has_race_table, is_pure_race, solve_race
+from ai.openingBook import book_move
+from ai.searchState import SearchState
+from game.board import WALL_SLOTS, slot_wall
+from game.pathFinding import find_shortest_path, wall_keeps_paths_open
+from game.wallEvaluation import rank_walls
+
+MOVE_CODES = PAWN_CODES + WALL_SLOTS
+MAX_PLY = 64
+
+# Scores are integers so null windows (alpha, alpha + 1) are exact
+WIN_SCORE = 10000
+INFINITY = 1000000
+ASPIRATION_WINDOW = 25
+
+# Late-move reductions: moves ordered after the first few search one ply shallower
+LMR_MIN_DEPTH = 3
+LMR_FULL_MOVES = 4
+LMR_REDUCTION = 1
+
+# Pondering runs until cancelled, this deep or this many seconds
+PONDER_MAX_DEPTH = 12
+PONDER_TIME_LIMIT = 30.0
+# Depth of the search that predicts the reply when the table has no move for it
+PREDICT_DEPTH = 2
+
+# Race tables a search may solve for wall layouts it first reaches inside the tree
+RACE_BUILDS = 2
+
+# Default number of walls searched per node, best first by path-length swing
+WALL_BUDGET = 10
+
+# Size of the table each worker process keeps for the root split
+SPLIT_TT_BITS = 16
+
+# Split searchers this worker process keeps, by (player, wall budget): their table,
+# killers and history carry over between tasks, iterations and moves
+_SPLIT_SEARCHERS = {}
+
+
+# Worker entry point for the parallel root split: search one root move of a
+# snapshotted position and return (score, nodes), score None if out of budget.
+# search_id changes with every search in the main process.
+def _search_split_move(snapshot, player_id, search_id, code, depth, alpha, beta, time_limit, node_limit,
+                       wall_budget):
+    searcher = _SPLIT_SEARCHERS.get((player_id, wall_budget))
+    if searcher is None:
+        searcher = HardAI(player_id, tt_bits=SPLIT_TT_BITS, wall_budget=wall_budget, use_book=False)
+        _SPLIT_SEARCHERS[(player_id, wall_budget)] = searcher
+    searcher.time_limit, searcher.node_limit = time_limit, node_limit
+    return searcher.search_root_move(SearchState.from_snapshot(snapshot), AIMove.from_code(code),
+                                     depth, alpha, beta, search_id)
+
+
+# Shared tables this worker process has attached to, by name
+_SHARED_TABLES = {}
+
+
+# Worker entry point for lazy SMP: search the same position as the main process
+# through the shared table until told to stop, and return the node count
+def _run_smp_helper(snapshot, player_id, table_name, size_bits, depth, start_depth, time_limit, node_limit,
+                    wall_budget):
+    table = _SHARED_TABLES.get(table_name)
+    if table is None:
+        table = _SHARED_TABLES[table_name] = SharedTranspositionTable(size_bits, table_name)
+    helper = HardAI(player_id, depth=depth, time_limit=time_limit, node_limit=node_limit, tt=table,
+                    wall_budget=wall_budget)
+    return helper.search_as_helper(SearchState.from_snapshot(snapshot), start_depth)
+
+# Hard AI using negamax principal-variation search with alpha-beta pruning
 class HardAI(AIPlayer):
     
-    def __init__(self, player_id, depth=3):
+    # depth is the deepest iteration; time_limit (seconds) and node_limit bound each move.
+    # workers > 1 splits root moves across that many processes from depth 2 on, or
+    # with lazy_smp runs workers - 1 helper searches that share one table with this one.
+    # wall_budget caps the wall moves tried at each node. With use_book, book moves
+    # searched at least depth deep are played without searching.
+    def __init__(self, player_id, depth=3, time_limit=None, node_limit=None, tt_bits=16, workers=1,
+                 lazy_smp=False, tt=None, wall_budget=WALL_BUDGET, use_book=True):
         self.player_id = player_id
         self.depth = depth
+        self.use_book = use_book
+        self.book_hits = 0
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.wall_budget = wall_budget
+        self.workers = workers
+        self.lazy_smp = lazy_smp and workers > 1
+        self._executor = None
+        self._is_helper = False
+        self.helper_nodes = 0
+        # Kept between moves: positions recur across turns as well as across branches
+        if tt is None:
+            tt = SharedTranspositionTable(tt_bits) if self.lazy_smp else TranspositionTable(tt_bits)
+        self.tt = tt
+        self.nodes = 0
+        self.completed_depth = 0
+        self._deadline = None
+        self._stopped = False
+        # Move ordering: two killer moves per ply and a history score per move code
+        self.killers = [[NO_MOVE, NO_MOVE] for _ in range(MAX_PLY)]
+        self.history = [0] * MOVE_CODES
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.race_hits = 0
+        self._race_builds = RACE_BUILDS
+        # Result of pondering the predicted reply: position key, move and depth reached
+        self._ponder_key = None
+        self._ponder_move = None
+        self._ponder_depth = 0
+        self._pondering = False
+        self.ponder_hits = 0
+        # Main search the split tasks last worked for, in a worker process
+        self._split_search_id = None
     
+    # Iterative deepening: each finished depth seeds move ordering for the next one.
+    # The table is kept between moves, so a search after pondering starts warm.
     def get_move(self, game_state):
-        best_move = None
-        best_score = float('-inf')
-        alpha = float('-inf')
-        beta = float('inf')
+        state = SearchState.from_game_state(game_state)
+        # Once walls are out of play the race is solved exactly
+        solved = solve_race(state)
+        if solved is not None and solved[2] is not None:
+            return AIMove.from_code(solved[2])
+        
+        if self.use_book:
+            move = book_move(state, self.depth)
+            if move is not None:
+                self.book_hits += 1
+                return move
+        
+        ponder_key, ponder_move, ponder_depth = self._ponder_key, self._ponder_move, self._ponder_depth
+        self._ponder_key = self._ponder_move = None
+        if state.key == ponder_key and ponder_move is not None and ponder_depth >= self.depth:
+            self.ponder_hits += 1
+            return ponder_move
+        return self._search(state)
+    
+    # Search the position after the reply our principal variation predicts until
+    # cancelled or out of ponder budget. Returns the predicted reply, or None if there is none.
+    def ponder(self, game_state):
+        state = SearchState.from_game_state(game_state)
+        if state.winner is not None:
+            return None
+        
+        limits = self.depth, self.time_limit, self.node_limit
+        self._pondering = True
+        # Left set by the last search whenever it ran out of budget or was cancelled
+        self._stopped = False
+        try:
+            reply = self._predict_reply(state)
+            if reply is None or self._stopped:
+                return None
+            
+            state.make_move(reply.code)
+            self.depth, self.time_limit, self.node_limit = PONDER_MAX_DEPTH, PONDER_TIME_LIMIT, None
+            move = self._search(state)
+        finally:
+            self.depth, self.time_limit, self.node_limit = limits
+            self._pondering = False
+        
+        self._ponder_key = state.key
+        self._ponder_move = move
+        self._ponder_depth = self.completed_depth
+        return reply
+    
+    # The table's move for the opponent, or a shallow search's when the root split
+    # kept the principal variation in worker tables
+    def _predict_reply(self, state):
+        code = self.tt.best_move(state.key)
+        if code != NO_MOVE:
+            reply = AIMove.from_code(code)
+            if self._is_legal(state, reply):
+                return reply
         
-        possible_moves = self._get_all_possible_moves(game_state)
+        self.depth, self.time_limit, self.node_limit = PREDICT_DEPTH, None, None
+        return self._search(state)
+    
+    def _search(self, state):
+        self.tt.new_search()
+        self._reset_search()
+        helpers = self._start_helpers(state) if self.lazy_smp else []
+        try:
+            return self._iterate(state, 1)
+        finally:
+            self._stop_helpers(helpers)
+    
+    def _reset_search(self):
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.race_hits = 0
+        self._race_builds = RACE_BUILDS
+        self.completed_depth = 0
+        self._stopped = False
+        self._deadline = None
+        self.killers = [[NO_MOVE, NO_MOVE] for _ in range(MAX_PLY)]
+        # Age history so older searches count for less
+        self.history = [score // 2 for score in self.history]
+        if self.time_limit is not None:
+            self._deadline = time.perf_counter() + self.time_limit
+    
+    def _iterate(self, state, start_depth):
+        possible_moves = self._get_all_possible_moves(state)
+        best_move = possible_moves[0] if possible_moves else None
+        score = None
         
-        for move in possible_moves:
-            self._apply_move(game_state, move)
-            score = self._minimax(game_state, self.depth - 1, alpha, beta, False)
-            self._undo_move(game_state, move)
+        for depth in range(start_depth, self.depth + 1):
+            # Root-split tasks cannot be cancelled mid-batch, so pondering stays in this process
+            if self.workers > 1 and depth > 1 and not self.lazy_smp and not self._pondering:
+                move, score = self._search_root_parallel(state, possible_moves, depth)
+            else:
+                move, score = self._search_with_aspiration(state, possible_moves, depth, score)
+            if self._stopped:
+                break
+            
+            best_move = move
+            self.completed_depth = depth
+            if move is not None:
+                self.tt.store(state.key, depth, score, EXACT, move.code)
+        
+        return best_move
+    
+    # Lazy SMP: helpers search the same position at staggered depths, odd ones one
+    # ply deeper, and only communicate through the shared table
+    def _start_helpers(self, state):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers - 1)
+        
+        self.tt.request_stop(False)
+        self.helper_nodes = 0
+        snapshot = state.snapshot()
+        return [
+            self._executor.submit(_run_smp_helper, snapshot, self.player_id, self.tt.name, self.tt.size_bits,
+                                  self.depth + helper % 2, 1 + helper % 2, self.time_limit, self.node_limit,
+                                  self.wall_budget)
+            for helper in range(1, self.workers)
+        ]
+    
+    def _stop_helpers(self, helpers):
+        if not helpers:
+            return
+        self.tt.request_stop()
+        for future in helpers:
+            self.helper_nodes += future.result()
+    
+    def search_as_helper(self, state, start_depth):
+        self._is_helper = True
+        self._reset_search()
+        self._iterate(state, start_depth)
+        return self.nodes
+    
+    # Search a narrow window around the previous iteration's score, widening on failure
+    def _search_with_aspiration(self, state, possible_moves, depth, previous_score):
+        alpha, beta = -INFINITY, INFINITY
+        if previous_score is not None and abs(previous_score) < WIN_SCORE:
+            alpha = previous_score - ASPIRATION_WINDOW
+            beta = previous_score + ASPIRATION_WINDOW
+        
+        while True:
+            move, score = self._search_root(state, possible_moves, depth, alpha, beta)
+            if self._stopped:
+                return move, score
+            if score <= alpha:
+                alpha = -INFINITY
+            elif score >= beta:
+                beta = INFINITY
+            else:
+                return move, score
+    
+    def _search_root(self, state, possible_moves, depth, alpha, beta):
+        best_move = None
+        best_score = -INFINITY
+        
+        for index, move in enumerate(self._order_moves(possible_moves, 0, state.key)):
+            state.make_move(move.code)
+            score = self._search_child(state, depth - 1, 1, alpha, beta, index)
+            state.unmake_move(move.code)
+            if self._stopped:
+                break
             
             if score > best_score:
                 best_score = score
                 best_move = move
             
             alpha = max(alpha, score)
+            if alpha >= beta:
+                break
         
-        return best_move
+        return best_move, best_score
+    
+    # Root split: the first move is searched alone to set alpha, then the rest in
+    # batches of one move per worker, each batch starting from the best score so far.
+    # Each worker process keeps one searcher, so tasks reuse its table, killers and
+    # history. Results are merged in move order, but a score can still depend on
+    # which worker's table searched the move.
+    def _search_root_parallel(self, state, possible_moves, depth):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        
+        snapshot = state.snapshot()
+        moves = self._order_moves(possible_moves, 0, state.key)
+        batches = [moves[:1]] + [moves[i:i + self.workers] for i in range(1, len(moves), self.workers)]
+        alpha = best_score = -INFINITY
+        best_move = None
+        
+        for batch in batches:
+            # Tasks in a batch run side by side: each gets the remaining time, and an
+            # equal share of the remaining nodes
+            time_limit = node_limit = None
+            if self._deadline is not None:
+                time_limit = max(0.0, self._deadline - time.perf_counter())
+            if self.node_limit is not None:
+                node_limit = max(0, self.node_limit - self.nodes) // len(batch)
+            
+            futures = [
+                self._executor.submit(_search_split_move, snapshot, self.player_id, self.tt.generation,
+                                      move.code, depth, alpha, INFINITY, time_limit, node_limit,
+                                      self.wall_budget)
+                for move in batch
+            ]
+            for move, future in zip(batch, futures):
+                score, nodes = future.result()
+                self.nodes += nodes
+                if score is None:
+                    self._stopped = True
+                elif score > best_score:
+                    best_score = score
+                    best_move = move
+            
+            if self.is_cancelled():
+                self._stopped = True
+            if self._stopped:
+                break
+            alpha = best_score
+        
+        return best_move, best_score
     
-    def _minimax(self, game_state, depth, alpha, beta, is_maximizing):
-        if depth == 0 or game_state.winner is not None:
-            return self._evaluate(game_state)
-        
-        possible_moves = self._get_all_possible_moves(game_state)
-        
-        if not possible_moves:
-            return self._evaluate(game_state)
-        
-        if is_maximizing:
-            max_eval = float('-inf')
-            for move in possible_moves:
-                self._apply_move(game_state, move)
-                eval_score = self._minimax(game_state, depth - 1, alpha, beta, False)
-                self._undo_move(game_state, move)
-                
-                max_eval = max(max_eval, eval_score)
-                alpha = max(alpha, eval_score)
-                
-                if beta <= alpha:
-                    break
-            return max_eval
+    # One root move of a split search; the budget applies from the first node.
+    # The table and history are aged once per main search, not once per task.
+    def search_root_move(self, state, move, depth, alpha, beta, search_id=None):
+        if search_id is None or search_id != self._split_search_id:
+            self._split_search_id = search_id
+            self.tt.new_search()
+            self._reset_search()
+        self.nodes = 0
+        self._stopped = False
+        self.completed_depth = depth - 1
+        self._deadline = None
+        if self.time_limit is not None:
+            self._deadline = time.perf_counter() + self.time_limit
+        
+        state.make_move(move.code)
+        score = -self._negamax(state, depth - 1, 1, -beta, -alpha)
+        state.unmake_move(move.code)
+        return (None if self._stopped else score), self.nodes
+    
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self.lazy_smp:
+            self.tt.close()
+            self.tt.unlink()
+            self.lazy_smp = False
+    
+    # Principal-variation search: the first move gets the full window, later
+    # moves a null window that is only widened when they might beat alpha.
+    # A reduced move that beats alpha is searched again at full depth.
+    def _search_child(self, state, depth, ply, alpha, beta, index, reduction=0):
+        if index == 0:
+            return -self._negamax(state, depth, ply, -beta, -alpha)
+        
+        if reduction:
+            score = -self._negamax(state, depth - reduction, ply, -alpha - 1, -alpha)
+            if score <= alpha or self._stopped:
+                return score
+        
+        score = -self._negamax(state, depth, ply, -alpha - 1, -alpha)
+        if alpha < score < beta and not self._stopped:
+            score = -self._negamax(state, depth, ply, -beta, -alpha)
+        return score
+    
+    # Stop and cancel requests apply at once; otherwise the first iteration
+    # always completes so there is a move to fall back on
+    def _out_of_budget(self):
+        if self._is_helper and self.tt.stop_requested():
+            return True
+        if self.is_cancelled():
+            return True
+        if self.completed_depth == 0:
+            return False
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            return True
+        return self._deadline is not None and time.perf_counter() >= self._deadline
+    
+    # Scores are from the point of view of the player to move
+    def _negamax(self, state, depth, ply, alpha, beta):
+        self.nodes += 1
+        if self._stopped or self._out_of_budget():
+            self._stopped = True
+            return 0
+        
+        # Pure races are looked up, not searched
+        race_score = self._race_score(state, build=True)
+        if race_score is not None:
+            return race_score
+        
+        if depth == 0 or state.winner is not None:
+            return self._evaluate_for_mover(state)
+        
+        key = state.key
+        entry = self.tt.probe(key)
+        if entry is not None:
+            entry_depth, value, flag, _ = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+        
+        # Off the principal variation, walls that change neither path are not searched
+        is_pv = beta - alpha > 1
+        possible_moves = self._staged_moves(state, ply, prune_quiet_walls=not is_pv)
+        
+        window_alpha, window_beta = alpha, beta
+        best_eval = -INFINITY
+        best_move = None
+        killers = self.killers[ply] if ply < MAX_PLY else ()
+        
+        for index, move in enumerate(possible_moves):
+            reduction = 0
+            if depth >= LMR_MIN_DEPTH and index >= LMR_FULL_MOVES and move.code not in killers:
+                reduction = LMR_REDUCTION
+            
+            state.make_move(move.code)
+            eval_score = self._search_child(state, depth - 1, ply + 1, alpha, beta, index, reduction)
+            state.unmake_move(move.code)
+            if self._stopped:
+                return 0
+            
+            if eval_score > best_eval:
+                best_eval = eval_score
+                best_move = move
+            alpha = max(alpha, eval_score)
+            
+            if alpha >= beta:
+                self._record_cutoff(move, depth, ply, index)
+                break
+        
+        if best_move is None:
+            return self._evaluate_for_mover(state)
+        
+        if best_eval <= window_alpha:
+            flag = UPPER
+        elif best_eval >= window_beta:
+            flag = LOWER
         else:
-            min_eval = float('inf')
-            for move in possible_moves:
-                self._apply_move(game_state, move)
-                eval_score = self._minimax(game_state, depth - 1, alpha, beta, True)
-                self._undo_move(game_state, move)
-                
-                min_eval = min(min_eval, eval_score)
-                beta = min(beta, eval_score)
-                
-                if beta <= alpha:
-                    break
-            return min_eval
-    
-    def _evaluate(self, game_state):
-        player = game_state.players[self.player_id]
-        opponent = game_state.players[1 - self.player_id]
-        
-        if game_state.winner is not None:
-            return 10000 if game_state.winner == self.player_id else -10000
-        
-        my_path = find_shortest_path(game_state.board, player.x, player.y, player.goals)
-        opp_path = find_shortest_path(game_state.board, opponent.x, opponent.y, opponent.goals)
+            flag = EXACT
+        self.tt.store(key, depth, best_eval, flag, best_move.code)
+        return best_eval
+    
+    # TT move first, then this ply's killers, then the rest by history score
+    def _order_moves(self, moves, ply, key):
+        tt_move = self.tt.best_move(key)
+        killers = self.killers[ply] if ply < MAX_PLY else ()
+        history = self.history
+        
+        def priority(move):
+            code = move.code
+            if code == tt_move:
+                return (0, 0)
+            if code in killers:
+                return (1, killers.index(code))
+            return (2, -history[code])
+        
+        return sorted(moves, key=priority)
+    
+    def _record_cutoff(self, move, depth, ply, index):
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        
+        code = move.code
+        self.history[code] += depth * depth
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != code:
+                killers[1] = killers[0]
+                killers[0] = code
+    
+    def search_stats(self):
+        return {
+            'nodes': self.nodes,
+            'depth': self.completed_depth,
+            'cutoffs': self.cutoffs,
+            'first_move_cutoff_rate': self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+            'tt_hit_rate': self.tt.hits / self.tt.probes if self.tt.probes else 0.0,
+            'helper_nodes': self.helper_nodes,
+            'ponder_hits': self.ponder_hits,
+            'race_hits': self.race_hits,
+        }
+    
+    # Exact score for the side to move if this is a solved pure race, else None.
+    # With build, a table missing for these walls is solved while the search's
+    # RACE_BUILDS last; the tables themselves are kept in the endgame module's LRU.
+    def _race_score(self, state, build=False):
+        if state.winner is not None or not is_pure_race(state):
+            return None
+        if not has_race_table(state.board.walls):
+            if not build or self._race_builds <= 0:
+                return None
+            self._race_builds -= 1
+        
+        solved = solve_race(state)
+        if solved is None:
+            return None
+        self.race_hits += 1
+        result, plies, _ = solved
+        return WIN_SCORE - plies if result == WIN else plies - WIN_SCORE
+    
+    def _evaluate(self, state):
+        player = state.players[self.player_id]
+        opponent = state.players[1 - self.player_id]
+        
+        if state.winner is not None:
+            return WIN_SCORE if state.winner == self.player_id else -WIN_SCORE
+        
+        race_score = self._race_score(state)
+        if race_score is not None:
+            return race_score if state.current_player_idx == self.player_id else -race_score
+        
+        my_path = find_shortest_path(state.board, player.x, player.y, player.goals)
+        opp_path = find_shortest_path(state.board, opponent.x, opponent.y, opponent.goals)
         
         path_diff = (opp_path - my_path) * 10
         wall_advantage = (player.walls_remaining - opponent.walls_remaining) * 2
         
         return path_diff + wall_advantage
     
-    def _get_all_possible_moves(self, game_state):
+    # Staged move picker: the TT move, then pawn moves, then walls. Each stage is only
+    # generated once the previous one is exhausted, so a cutoff skips the wall scan.
+    def _staged_moves(self, state, ply, prune_quiet_walls=False):
+        tt_code = self.tt.best_move(state.key)
+        if tt_code != NO_MOVE:
+            tt_move = AIMove.from_code(tt_code)
+            if self._is_legal(state, tt_move):
+                yield tt_move
+        
+        player = state.get_current_player()
+        pawn_moves = [AIMove(pos.x, pos.y) for pos in state.get_valid_moves(player)]
+        for move in self._order_moves(pawn_moves, ply, state.key):
+            if move.code != tt_code:
+                yield move
+        
+        if player.walls_remaining > 0:
+            wall_moves = self._get_candidate_walls(state, prune_quiet_walls)
+            for move in self._order_moves(wall_moves, ply, state.key):
+                if move.code != tt_code:
+                    yield move
+    
+    def _is_legal(self, state, move):
+        player = state.get_current_player()
+        if move.type.value == "pawn":
+            return any(pos.x == move.x and pos.y == move.y for pos in state.get_valid_moves(player))
+        
+        board = state.board
+        return (player.walls_remaining > 0 and board.can_place_wall(move.x, move.y, move.is_horizontal)
+                and wall_keeps_paths_open(board, state.players, move.x, move.y, move.is_horizontal))
+    
+    def _evaluate_for_mover(self, state):
+        score = self._evaluate(state)
+        return score if state.current_player_idx == self.player_id else -score
+    
+    def _get_all_possible_moves(self, state, prune_quiet_walls=False):
         moves = []
-        player = game_state.get_current_player()
+        player = state.get_current_player()
         
         # Add pawn moves
-        valid_moves = game_state.get_valid_moves(player)
+        valid_moves = state.get_valid_moves(player)
         for pos in valid_moves:
             moves.append(AIMove(pos.x, pos.y))
         
         # Add strategic wall placements (limited to reduce search space)
         if player.walls_remaining > 0:
-            wall_moves = self._get_candidate_walls(game_state)
-            moves.extend(wall_moves[:10])  # Limit to 10 best walls
+            wall_moves = self._get_candidate_walls(state, prune_quiet_walls)
+            moves.extend(wall_moves)
         
         return moves
     
-    def _get_candidate_walls(self, game_state):
-        walls = []
-        opponent = game_state.players[1 - self.player_id]
-        opp_x, opp_y = opponent.x, opponent.y
-        
-        # Only check walls near opponent
-        for dy in range(-2, 3):
-            for dx in range(-2, 3):
-                x = opp_x + dx
-                y = opp_y + dy
-                
-                if not (0 <= x < BOARD_SIZE - 1 and 0 <= y < BOARD_SIZE - 1):
-                    continue
-                
-                for is_horizontal in [True, False]:
-                    if game_state.board.can_place_wall(x, y, is_horizontal):
-                        game_state.board.place_wall(x, y, is_horizontal)
-                        
-                        valid = True
-                        for p in game_state.players:
-                            if not has_valid_path(game_state.board, p.x, p.y, p.goals):
-                                valid = False
-                                break
-                        
-                        game_state.board.remove_wall(x, y, is_horizontal)
-                        
-                        if valid:
-                            walls.append(AIMove(x, y, is_horizontal))
-        
-        return walls
-    
-    def _apply_move(self, game_state, move):
-        if move.type.value == "pawn":
-            player = game_state.get_current_player()
-            move.old_x = player.x
-            move.old_y = player.y
-            player.move(move.x, move.y)
-        else:  # wall
-            game_state.board.place_wall(move.x, move.y, move.is_horizontal)
-            game_state.get_current_player().place_wall()
-        
-        # Switch turn (simplified)
-        game_state.switch_turn()
-    
-    def _undo_move(self, game_state, move):
-        # Switch turn back
-        game_state.switch_turn()
-        
-        if move.type.value == "pawn":
-            player = game_state.get_current_player()
-            player.move(move.old_x, move.old_y)
-        else:  # wall
-            game_state.board.remove_wall(move.x, move.y, move.is_horizontal)
-            game_state.get_current_player().undo_place_wall()
+    def _get_candidate_walls(self, state, prune_quiet=False):
+        player = state.get_current_player()
+        slots = rank_walls(state.board, state.players, player.player_id, self.wall_budget, prune_quiet)
+        return [AIMove(*slot_wall(slot)) for slot in slots]
@@ -0,0 +1,277 @@
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from ai.aiPlayer import PAWN_CODES, AIPlayer, AIMove
+from ai.endgame import solve_race
+from ai.searchState import SearchState
+from game.board import EDGE_BLOCKERS, EDGE_COUNT, cell_index, slot_wall
+from game.gameState import valid_pawn_cells
+from game.pathFinding import field_path_edges, wall_keeps_paths_open
+from game.wallEvaluation import rank_walls
+
+# UCT exploration constant
+EXPLORATION = 1.4
+# Walls expanded at each tree node, best first by path-length swing
+WALL_BUDGET = 8
+# Rollouts stop after this many plies and are scored from path lengths
+ROLLOUT_PLIES = 40
+# Chance a rollout pawn move follows the shortest path rather than a random step
+ROLLOUT_GREEDY = 0.8
+# Chance a rollout move tries a wall across the opponent's shortest path
+ROLLOUT_WALL = 0.1
+
+
+# Stop flags this worker process has attached to, by name
+_STOP_FLAGS = {}
+
+
+# Worker entry point for root-parallel mode: grow an independent tree from the
+# snapshot and return the visit count of every root move. The search also ends
+# when the main process sets the shared stop flag.
+def _run_mcts_worker(snapshot, player_id, playouts, time_limit, seed, stop_name):
+    stop = _STOP_FLAGS.get(stop_name)
+    if stop is None:
+        stop = _STOP_FLAGS[stop_name] = shared_memory.SharedMemory(name=stop_name)
+    worker = MCTSAI(player_id, playouts=playouts, time_limit=time_limit, seed=seed)
+    worker._stop = stop
+    root = worker.search(SearchState.from_snapshot(snapshot))
+    return {child.code: child.visits for child in root.children}
+
+
+class MCTSNode:
+    __slots__ = ('code', 'parent', 'player', 'key', 'children', 'untried', 'visits', 'wins')
+
+    # player made the move (code) leading here; wins are counted for that player
+    def __init__(self, code, parent, player, key):
+        self.code = code
+        self.parent = parent
+        self.player = player
+        self.key = key
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.wins = 0
+
+
+# Monte Carlo tree search with UCT selection and shortest-path-biased rollouts
+class MCTSAI(AIPlayer):
+
+    # playouts and time_limit (seconds) bound each move; either may be None.
+    # workers > 1 grows that many independent trees in parallel and sums root visits.
+    def __init__(self, player_id, playouts=2000, time_limit=None, workers=1, seed=None):
+        self.player_id = player_id
+        self.playouts = playouts
+        self.time_limit = time_limit
+        self.workers = workers
+        self.rng = random.Random(seed)
+        self._executor = None
+        # One-byte shared flag that cancel() sets to stop the worker searches
+        self._stop = None
+        # Subtree kept from the last move, rooted at the position after our move
+        self._root = None
+        self.playouts_run = 0
+
+    def get_move(self, game_state):
+        state = SearchState.from_game_state(game_state)
+        solved = solve_race(state)
+        if solved is not None and solved[2] is not None:
+            self._root = None
+            return AIMove.from_code(solved[2])
+
+        futures = self._start_workers(state) if self.workers > 1 else []
+        root = self.search(state, self._reuse_root(state))
+
+        visits = {child.code: child.visits for child in root.children}
+        for future in futures:
+            for code, count in future.result().items():
+                visits[code] = visits.get(code, 0) + count
+        if not visits:
+            return None
+
+        best_code = min(visits, key=lambda code: (-visits[code], code))
+        self._root = next((child for child in root.children if child.code == best_code), None)
+        if self._root is not None:
+            self._root.parent = None
+        return AIMove.from_code(best_code)
+
+    # Run playouts from root (a fresh one if None) until the budget is spent
+    def search(self, state, root=None):
+        if root is None:
+            root = MCTSNode(None, None, 1 - state.current_player_idx, state.key)
+        deadline = None
+        if self.time_limit is not None:
+            deadline = time.perf_counter() + self.time_limit
+
+        self.playouts_run = 0
+        while True:
+            self._playout(root, state)
+            self.playouts_run += 1
+            if self.playouts is not None and self.playouts_run >= self.playouts:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if self.is_cancelled():
+                break
+        return root
+
+    # The kept subtree's node for this position, if the opponent's reply is in it
+    def _reuse_root(self, state):
+        root, self._root = self._root, None
+        if root is None:
+            return None
+        if root.key == state.key:
+            return root
+        for child in root.children:
+            if child.key == state.key:
+                child.parent = None
+                return child
+        return None
+
+    def _start_workers(self, state):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers - 1)
+            self._stop = shared_memory.SharedMemory(create=True, size=1)
+        snapshot = state.snapshot()
+        return [
+            self._executor.submit(_run_mcts_worker, snapshot, self.player_id, self.playouts,
+                                  self.time_limit, self.rng.getrandbits(32), self._stop.name)
+            for _ in range(self.workers - 1)
+        ]
+
+    # The flag is cleared and set together with the cancel event
+    def prepare_cancel(self):
+        super().prepare_cancel()
+        if self._stop is not None:
+            self._stop.buf[0] = 0
+
+    def cancel(self):
+        super().cancel()
+        if self._stop is not None:
+            self._stop.buf[0] = 1
+
+    def is_cancelled(self):
+        return super().is_cancelled() or (self._stop is not None and self._stop.buf[0] != 0)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._stop is not None:
+            self._stop.close()
+            self._stop.unlink()
+            self._stop = None
+
+    def _playout(self, root, state):
+        node = root
+        path = [root]
+        made = []
+
+        # Select with UCT down to a node with untried moves, then expand one of them
+        while state.winner is None:
+            if node.untried is None:
+                node.untried = self._expansion_order(state)
+            if node.untried:
+                code = node.untried.pop()
+                player = state.current_player_idx
+                state.make_move(code)
+                made.append(code)
+                node.children.append(MCTSNode(code, node, player, state.key))
+                node = node.children[-1]
+                path.append(node)
+                break
+            if not node.children:
+                break
+            node = self._select(node)
+            state.make_move(node.code)
+            made.append(node.code)
+            path.append(node)
+
+        winner = self._rollout(state)
+        for visited in path:
+            visited.visits += 1
+            if visited.player == winner:
+                visited.wins += 1
+
+        while made:
+            state.unmake_move(made.pop())
+
+    def _select(self, node):
+        log_visits = math.log(node.visits)
+        best_child = None
+        best_score = -1.0
+        for child in node.children:
+            score = child.wins / child.visits + EXPLORATION * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best_score = score
+                best_child = child
+        return best_child
+
+    # Move codes in reverse priority, so popping from the end expands the best first:
+    # pawn moves nearest the goal, then the highest-ranked walls
+    def _expansion_order(self, state):
+        board = state.board
+        player = state.get_current_player()
+        opponent = state.get_opponent()
+        field = board.distance_field(player.goals)
+        codes = sorted(valid_pawn_cells(board.neighbors, cell_index(player.x, player.y),
+                                        cell_index(opponent.x, opponent.y)),
+                       key=field.__getitem__)
+        if player.walls_remaining > 0:
+            codes += [PAWN_CODES + slot for slot in
+                      rank_walls(board, state.players, player.player_id, WALL_BUDGET)]
+        codes.reverse()
+        return codes
+
+    # Play fast moves to the end (or ROLLOUT_PLIES) and return the winner. Unfinished
+    # games go to the player to move if their path is no longer than the opponent's.
+    def _rollout(self, state):
+        made = []
+        while state.winner is None and len(made) < ROLLOUT_PLIES:
+            code = self._rollout_move(state)
+            if code is None:
+                break
+            state.make_move(code)
+            made.append(code)
+
+        winner = state.winner
+        if winner is None:
+            board = state.board
+            player = state.get_current_player()
+            opponent = state.get_opponent()
+            mine = board.distance_field(player.goals)[cell_index(player.x, player.y)]
+            theirs = board.distance_field(opponent.goals)[cell_index(opponent.x, opponent.y)]
+            winner = player.player_id if mine <= theirs else opponent.player_id
+
+        while made:
+            state.unmake_move(made.pop())
+        return winner
+
+    def _rollout_move(self, state):
+        rng = self.rng
+        board = state.board
+        player = state.get_current_player()
+        opponent = state.get_opponent()
+
+        if player.walls_remaining > 0 and rng.random() < ROLLOUT_WALL:
+            # A wall on a random edge of the opponent's shortest path
+            path = field_path_edges(board, opponent.x, opponent.y, opponent.goals) or 0
+            edges = [edge for edge in range(EDGE_COUNT) if path >> edge & 1]
+            if edges:
+                blockers = EDGE_BLOCKERS[rng.choice(edges)]
+                slot = rng.choice([slot for slot in range(blockers.bit_length()) if blockers >> slot & 1])
+                x, y, is_horizontal = slot_wall(slot)
+                if (board.can_place_wall(x, y, is_horizontal) and
+                        wall_keeps_paths_open(board, state.players, x, y, is_horizontal)):
+                    return PAWN_CODES + slot
+
+        cells = valid_pawn_cells(board.neighbors, cell_index(player.x, player.y),
+                                 cell_index(opponent.x, opponent.y))
+        if not cells:
+            return None
+        if rng.random() < ROLLOUT_GREEDY:
+            field = board.distance_field(player.goals)
+            return min(cells, key=field.__getitem__)
+        return rng.choice(cells)
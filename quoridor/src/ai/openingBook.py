@@ -0,0 +1,154 @@
+import argparse
+import mmap
+import os
+import struct
+
+from ai.aiPlayer import PAWN_CODES, AIMove
+from ai.searchState import SearchState
+from game.board import cell_index, slot_wall
+from game.gameState import GameState
+from game.pathFinding import wall_keeps_paths_open
+
+# Default book, shipped next to this module and rebuilt with
+#   python -m ai.openingBook --plies 8 --depth 6   (from src/)
+BOOK_PATH = os.path.join(os.path.dirname(__file__), "opening_book.bin")
+
+# File layout: magic and record count, then fixed-size records sorted by key.
+# A record is the position's Zobrist key, the move code, its score for the side
+# to move and the depth it was searched to.
+MAGIC = b"QOB1"
+HEADER = struct.Struct("<4sI")
+RECORD = struct.Struct("<QHhB")
+
+
+class OpeningBook:
+    # Read-only view of a book file. The file is memory-mapped, so opening it costs
+    # nothing up front and lookups binary-search the records in place.
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or len(self._map) != HEADER.size + self.count * RECORD.size:
+            self._map.close()
+            raise ValueError(f"{path} is not an opening book")
+
+    def __len__(self):
+        return self.count
+
+    # (move code, score, depth) stored for key, or None
+    def lookup(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record = RECORD.unpack_from(self._map, HEADER.size + mid * RECORD.size)
+            if record[0] < key:
+                lo = mid + 1
+            elif record[0] > key:
+                hi = mid
+            else:
+                return record[1:]
+        return None
+
+    def close(self):
+        self._map.close()
+
+
+# entries maps key -> (move code, score, depth)
+def write_book(path, entries):
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(entries)))
+        for key in sorted(entries):
+            f.write(RECORD.pack(key, *entries[key]))
+
+
+_BOOKS = {}
+
+
+# The book at path, opened once per process; None if there is no usable file
+def open_book(path=BOOK_PATH):
+    if path not in _BOOKS:
+        try:
+            _BOOKS[path] = OpeningBook(path)
+        except (OSError, ValueError):
+            _BOOKS[path] = None
+    return _BOOKS[path]
+
+
+# The book move for a SearchState if it was searched at least min_depth deep and
+# is legal here, else None
+def book_move(state, min_depth=0, path=BOOK_PATH):
+    book = open_book(path)
+    if book is None:
+        return None
+    entry = book.lookup(state.key)
+    if entry is None or entry[2] < min_depth:
+        return None
+
+    code = entry[0]
+    player = state.get_current_player()
+    if code < PAWN_CODES:
+        move = AIMove.from_code(code)
+        if not any(pos.x == move.x and pos.y == move.y for pos in state.get_valid_moves(player)):
+            return None
+        return move
+
+    x, y, is_horizontal = slot_wall(code - PAWN_CODES)
+    board = state.board
+    if not (player.walls_remaining > 0 and board.can_place_wall(x, y, is_horizontal)
+            and wall_keeps_paths_open(board, state.players, x, y, is_horizontal)):
+        return None
+    return AIMove(x, y, is_horizontal)
+
+
+# Self-play over the first plies of the game: every position reached is searched
+# to depth and its move stored. Each side follows the engine's move and also every
+# other pawn move, so the book covers the usual ways an opponent deviates.
+def build_book(path=BOOK_PATH, plies=8, depth=6, progress=None):
+    from ai.hard_ai import HardAI
+
+    searchers = [HardAI(player_id, depth=depth, use_book=False) for player_id in (0, 1)]
+    entries = {}
+    frontier = [SearchState.from_game_state(GameState())]
+
+    for ply in range(plies):
+        next_frontier = []
+        for state in frontier:
+            if state.key in entries or state.winner is not None:
+                continue
+            searcher = searchers[state.current_player_idx]
+            move = searcher.get_move(state)
+            if move is None:
+                continue
+            entry = searcher.tt.probe(state.key)
+            score = entry[1] if entry is not None and entry[3] == move.code else 0
+            entries[state.key] = (move.code, score, searcher.completed_depth)
+
+            replies = {move.code} | {cell_index(pos.x, pos.y) for pos in state.get_valid_moves()}
+            for code in sorted(replies):
+                child = state.copy()
+                child.make_move(code)
+                next_frontier.append(child)
+        frontier = next_frontier
+        if progress is not None:
+            progress(ply + 1, len(entries))
+
+    write_book(path, entries)
+    return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Quoridor opening book from engine self-play.")
+    parser.add_argument("--output", default=BOOK_PATH)
+    parser.add_argument("--plies", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=6)
+    args = parser.parse_args()
+
+    count = build_book(args.output, args.plies, args.depth,
+                       progress=lambda ply, total: print(f"ply {ply}: {total} positions"))
+    print(f"wrote {count} positions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+from ai.aiPlayer import PAWN_CODES
+from ai.zobrist import PAWN_KEYS, SIDE_KEY, WALL_COUNT_KEYS, WALL_KEYS, hash_position
+from game.board import Board, cell_index, slot_wall
+from game.gameState import valid_pawn_cells
+from game.pathFinding import POSITIONS
+from util.constants import BOARD_SIZE, PLAYER_GOALS
+
+
+class SearchPawn:
+    __slots__ = ('player_id', 'x', 'y', 'goals', 'walls_remaining')
+
+    def __init__(self, player_id, x, y, walls_remaining):
+        self.player_id = player_id
+        self.x = x
+        self.y = y
+        self.goals = PLAYER_GOALS[player_id]
+        self.walls_remaining = walls_remaining
+
+
+class SearchState:
+    # Position the AIs search on, built from a GameState snapshot so thinking never
+    # touches the live game. Moves are codes (cell, or PAWN_CODES + wall slot);
+    # make_move/unmake_move keep the Zobrist key in step and must be paired LIFO.
+
+    def __init__(self, board, players, current_player_idx, winner=None):
+        self.board = board
+        self.players = players
+        self.current_player_idx = current_player_idx
+        self.winner = winner
+        self.key = hash_position(self)
+        self._trail = []
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        walls, current_player_idx, winner, pawns = snapshot
+        players = [SearchPawn(player_id, x, y, walls_remaining)
+                   for player_id, (x, y, walls_remaining) in enumerate(pawns)]
+        return cls(Board.from_walls(walls), players, current_player_idx, winner)
+
+    @classmethod
+    def from_game_state(cls, game_state):
+        return cls.from_snapshot(game_state.snapshot())
+
+    def snapshot(self):
+        return (self.board.walls, self.current_player_idx, self.winner,
+                tuple((p.x, p.y, p.walls_remaining) for p in self.players))
+
+    def copy(self):
+        return SearchState.from_snapshot(self.snapshot())
+
+    def get_current_player(self):
+        return self.players[self.current_player_idx]
+
+    def get_opponent(self):
+        return self.players[1 - self.current_player_idx]
+
+    def get_valid_moves(self, player=None):
+        if player is None:
+            player = self.get_current_player()
+        opponent = self.players[1 - player.player_id]
+        return [POSITIONS[cell] for cell in valid_pawn_cells(self.board.neighbors,
+                                                             cell_index(player.x, player.y),
+                                                             cell_index(opponent.x, opponent.y))]
+
+    def make_move(self, code):
+        player = self.players[self.current_player_idx]
+        player_id = player.player_id
+        key = self.key ^ SIDE_KEY
+
+        if code < PAWN_CODES:
+            old_cell = cell_index(player.x, player.y)
+            keys = PAWN_KEYS[player_id]
+            key ^= keys[old_cell] ^ keys[code]
+            player.x = code % BOARD_SIZE
+            player.y = code // BOARD_SIZE
+            self._trail.append((old_cell, self.winner))
+            if player.y == player.goals:
+                self.winner = player_id
+        else:
+            slot = code - PAWN_CODES
+            self.board.place_wall(*slot_wall(slot))
+            counts = WALL_COUNT_KEYS[player_id]
+            key ^= counts[player.walls_remaining] ^ counts[player.walls_remaining - 1] ^ WALL_KEYS[slot]
+            player.walls_remaining -= 1
+            self._trail.append((-1, self.winner))
+
+        self.key = key
+        self.current_player_idx = 1 - self.current_player_idx
+
+    def unmake_move(self, code):
+        self.current_player_idx = 1 - self.current_player_idx
+        player = self.players[self.current_player_idx]
+        player_id = player.player_id
+        key = self.key ^ SIDE_KEY
+        old_cell, self.winner = self._trail.pop()
+
+        if code < PAWN_CODES:
+            keys = PAWN_KEYS[player_id]
+            key ^= keys[code] ^ keys[old_cell]
+            player.x = old_cell % BOARD_SIZE
+            player.y = old_cell // BOARD_SIZE
+        else:
+            slot = code - PAWN_CODES
+            self.board.remove_wall(*slot_wall(slot))
+            player.walls_remaining += 1
+            counts = WALL_COUNT_KEYS[player_id]
+            key ^= counts[player.walls_remaining] ^ counts[player.walls_remaining - 1] ^ WALL_KEYS[slot]
+
+        self.key = key
@@ -0,0 +1,171 @@
+from multiprocessing import shared_memory
+
+# Bound types for stored scores
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+NO_MOVE = -1
+
+
+class TranspositionTable:
+    # Fixed-size, directly indexed table of search results keyed by Zobrist hash.
+    # An entry is replaced when it belongs to an older search or the new result
+    # was searched at least as deep.
+
+    def __init__(self, size_bits=16):
+        self.size = 1 << size_bits
+        self.mask = self.size - 1
+        self.keys = [0] * self.size
+        self.depths = [-1] * self.size
+        self.values = [0] * self.size
+        self.flags = bytearray(self.size)
+        self.moves = [NO_MOVE] * self.size
+        self.ages = bytearray(self.size)
+        self.generation = 0
+        self.probes = 0
+        self.hits = 0
+
+    def new_search(self):
+        self.generation = (self.generation + 1) & 0xFF
+
+    def probe(self, key):
+        self.probes += 1
+        index = key & self.mask
+        if self.keys[index] != key or self.depths[index] < 0:
+            return None
+        self.hits += 1
+        return self.depths[index], self.values[index], self.flags[index], self.moves[index]
+
+    def best_move(self, key):
+        index = key & self.mask
+        if self.keys[index] != key or self.depths[index] < 0:
+            return NO_MOVE
+        return self.moves[index]
+
+    def store(self, key, depth, value, flag, move=NO_MOVE):
+        index = key & self.mask
+        same = self.keys[index] == key
+        if not (same or self.ages[index] != self.generation or depth >= self.depths[index]):
+            return
+        if same and move == NO_MOVE:
+            move = self.moves[index]
+
+        self.keys[index] = key
+        self.depths[index] = depth
+        self.values[index] = value
+        self.flags[index] = flag
+        self.moves[index] = move
+        self.ages[index] = self.generation
+
+    def clear(self):
+        self.keys = [0] * self.size
+        self.depths = [-1] * self.size
+        self.moves = [NO_MOVE] * self.size
+        self.probes = 0
+        self.hits = 0
+
+
+# Shared table layout: an 8-byte header (generation, stop flag) followed by two
+# 64-bit words per entry, key ^ data and data. A torn write fails the key check,
+# so entries are read and written without locks.
+HEADER_BYTES = 8
+STOP_OFFSET = 1
+_DEPTH_SHIFT, _FLAG_SHIFT, _MOVE_SHIFT, _AGE_SHIFT, _VALUE_SHIFT = 0, 8, 10, 18, 26
+_VALUE_BIAS = 1 << 31
+
+
+def _pack(depth, value, flag, move, age):
+    return ((depth + 1) << _DEPTH_SHIFT | flag << _FLAG_SHIFT | (move + 1) << _MOVE_SHIFT |
+            age << _AGE_SHIFT | (value + _VALUE_BIAS) << _VALUE_SHIFT)
+
+
+def _unpack(data):
+    return ((data >> _DEPTH_SHIFT & 0xFF) - 1, (data >> _VALUE_SHIFT) - _VALUE_BIAS,
+            data >> _FLAG_SHIFT & 0x3, (data >> _MOVE_SHIFT & 0xFF) - 1)
+
+
+class SharedTranspositionTable:
+    # Same interface and replacement rule as TranspositionTable, stored in a
+    # shared memory block that other processes attach to by name.
+    # The header also carries a stop flag so helper searches can be halted.
+
+    def __init__(self, size_bits=16, name=None):
+        self.size_bits = size_bits
+        self.size = 1 << size_bits
+        self.mask = self.size - 1
+        if name is None:
+            # New blocks are zero-filled, which reads as an empty table
+            self._shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + self.size * 16)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.name = self._shm.name
+        self._header = self._shm.buf[:HEADER_BYTES]
+        self._words = self._shm.buf[HEADER_BYTES:HEADER_BYTES + self.size * 16].cast('Q')
+        self.probes = 0
+        self.hits = 0
+
+    @property
+    def generation(self):
+        return self._header[0]
+
+    def new_search(self):
+        self._header[0] = (self._header[0] + 1) & 0xFF
+
+    def request_stop(self, stop=True):
+        self._header[STOP_OFFSET] = stop
+
+    def stop_requested(self):
+        return self._header[STOP_OFFSET] != 0
+
+    def _read(self, key):
+        index = (key & self.mask) << 1
+        data = self._words[index + 1]
+        if not data or self._words[index] ^ data != key:
+            return None
+        return data
+
+    def probe(self, key):
+        self.probes += 1
+        data = self._read(key)
+        if data is None:
+            return None
+        self.hits += 1
+        return _unpack(data)
+
+    def best_move(self, key):
+        data = self._read(key)
+        if data is None:
+            return NO_MOVE
+        return (data >> _MOVE_SHIFT & 0xFF) - 1
+
+    def store(self, key, depth, value, flag, move=NO_MOVE):
+        index = (key & self.mask) << 1
+        words = self._words
+        generation = self._header[0]
+        data = words[index + 1]
+        if data:
+            same = words[index] ^ data == key
+            old_depth = (data >> _DEPTH_SHIFT & 0xFF) - 1
+            old_age = data >> _AGE_SHIFT & 0xFF
+            if not (same or old_age != generation or depth >= old_depth):
+                return
+            if same and move == NO_MOVE:
+                move = (data >> _MOVE_SHIFT & 0xFF) - 1
+
+        data = _pack(depth, value, flag, move, generation)
+        words[index] = key ^ data
+        words[index + 1] = data
+
+    def clear(self):
+        self._shm.buf[HEADER_BYTES:HEADER_BYTES + self.size * 16] = bytes(self.size * 16)
+        self.probes = 0
+        self.hits = 0
+
+    def close(self):
+        self._words.release()
+        self._header.release()
+        self._shm.close()
+
+    def unlink(self):
+        self._shm.unlink()
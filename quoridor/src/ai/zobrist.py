@@ -0,0 +1,28 @@
+import random
+
+from game.board import WALL_SLOTS, cell_index
+from util.constants import BOARD_SIZE, MAX_PLAYERS, WALLS_PER_PLAYER
+
+# Fixed seed so keys are identical in every process and every run
+_rng = random.Random(0x51C0B)
+
+PAWN_KEYS = [[_rng.getrandbits(64) for _ in range(BOARD_SIZE * BOARD_SIZE)] for _ in range(MAX_PLAYERS)]
+WALL_KEYS = [_rng.getrandbits(64) for _ in range(WALL_SLOTS)]
+WALL_COUNT_KEYS = [[_rng.getrandbits(64) for _ in range(WALLS_PER_PLAYER + 1)] for _ in range(MAX_PLAYERS)]
+SIDE_KEY = _rng.getrandbits(64)
+
+
+def hash_position(game_state):
+    key = 0
+    for p in game_state.players:
+        key ^= PAWN_KEYS[p.player_id][cell_index(p.x, p.y)]
+        key ^= WALL_COUNT_KEYS[p.player_id][p.walls_remaining]
+
+    walls = game_state.board.walls
+    for slot in range(WALL_SLOTS):
+        if walls >> slot & 1:
+            key ^= WALL_KEYS[slot]
+
+    if game_state.current_player_idx:
+        key ^= SIDE_KEY
+    return key
@@ -1,99 +1,370 @@
+from game.distanceField import DistanceFields
 from util.constants import BOARD_SIZE
 
+WALL_GRID = BOARD_SIZE - 1
+WALL_SLOTS = 2 * WALL_GRID * WALL_GRID
+
+# Edges between horizontally adjacent cells come first, then vertically adjacent ones
+RIGHT_EDGES = WALL_GRID * BOARD_SIZE
+EDGE_COUNT = 2 * RIGHT_EDGES
+
+
+def wall_slot(x, y, is_horizontal):
+    slot = y * WALL_GRID + x
+    return slot if is_horizontal else slot + WALL_GRID * WALL_GRID
+
+
+def slot_wall(slot):
+    is_horizontal = slot < WALL_GRID * WALL_GRID
+    y, x = divmod(slot % (WALL_GRID * WALL_GRID), WALL_GRID)
+    return x, y, is_horizontal
+
+
+def right_edge(x, y):
+    return y * WALL_GRID + x
+
+
+def down_edge(x, y):
+    return RIGHT_EDGES + y * BOARD_SIZE + x
+
+
+def cell_index(x, y):
+    return y * BOARD_SIZE + x
+
+
+def edge_between(first, second):
+    low = min(first, second)
+    y, x = divmod(low, BOARD_SIZE)
+    if abs(second - first) == 1:
+        return right_edge(x, y)
+    return down_edge(x, y)
+
+
+def _build_wall_tables():
+    conflicts = [0] * WALL_SLOTS
+    edges = [()] * WALL_SLOTS
+    last = BOARD_SIZE - 2
+
+    for y in range(WALL_GRID):
+        for x in range(WALL_GRID):
+            # Horizontal wall: itself, overlapping vertical walls, adjacent horizontal walls
+            mask = 1 << wall_slot(x, y, True)
+            if x > 0:
+                mask |= 1 << wall_slot(x - 1, y, False)
+                mask |= 1 << wall_slot(x - 1, y, True)
+            if x < last:
+                mask |= 1 << wall_slot(x, y, False)
+                mask |= 1 << wall_slot(x + 1, y, True)
+            conflicts[wall_slot(x, y, True)] = mask
+            edges[wall_slot(x, y, True)] = (down_edge(x, y), down_edge(x + 1, y))
+
+            # Vertical wall: itself, overlapping horizontal walls, adjacent vertical walls
+            mask = 1 << wall_slot(x, y, False)
+            if y > 0:
+                mask |= 1 << wall_slot(x, y - 1, True)
+                mask |= 1 << wall_slot(x, y - 1, False)
+            if y < last:
+                mask |= 1 << wall_slot(x, y, True)
+                mask |= 1 << wall_slot(x, y + 1, False)
+            conflicts[wall_slot(x, y, False)] = mask
+            edges[wall_slot(x, y, False)] = (right_edge(x, y), right_edge(x, y + 1))
+
+    # Walls that block each edge, used to keep shared edges closed on removal
+    blockers = [0] * EDGE_COUNT
+    for slot, wall_edges in enumerate(edges):
+        for edge in wall_edges:
+            blockers[edge] |= 1 << slot
+
+    masks = [(1 << first) | (1 << second) for first, second in edges]
+    return conflicts, edges, masks, blockers
+
+
+WALL_CONFLICTS, WALL_EDGES, WALL_EDGE_MASKS, EDGE_BLOCKERS = _build_wall_tables()
+
+
+def _build_cell_tables():
+    # (neighbor, edge) pairs per cell in left, right, up, down order
+    links = []
+    for y in range(BOARD_SIZE):
+        for x in range(BOARD_SIZE):
+            cell_links = []
+            if x > 0:
+                cell_links.append((cell_index(x - 1, y), right_edge(x - 1, y)))
+            if x < WALL_GRID:
+                cell_links.append((cell_index(x + 1, y), right_edge(x, y)))
+            if y > 0:
+                cell_links.append((cell_index(x, y - 1), down_edge(x, y - 1)))
+            if y < WALL_GRID:
+                cell_links.append((cell_index(x, y + 1), down_edge(x, y)))
+            links.append(tuple(cell_links))
+
+    edge_cells = [None] * EDGE_COUNT
+    for cell, cell_links in enumerate(links):
+        for neighbor, edge in cell_links:
+            edge_cells[edge] = (min(cell, neighbor), max(cell, neighbor))
+
+    return links, edge_cells
+
+
+CELL_LINKS, EDGE_CELLS = _build_cell_tables()
+
+# Wall corners form a (BOARD_SIZE + 1) x (BOARD_SIZE + 1) lattice; every border corner is one anchor
+CORNER_SPAN = BOARD_SIZE + 1
+CORNER_COUNT = CORNER_SPAN * CORNER_SPAN
+BORDER_CORNERS = tuple(
+    j * CORNER_SPAN + i
+    for j in range(CORNER_SPAN) for i in range(CORNER_SPAN)
+    if i in (0, BOARD_SIZE) or j in (0, BOARD_SIZE)
+)
+
+
+def _build_wall_corners():
+    corners = [()] * WALL_SLOTS
+    for y in range(WALL_GRID):
+        for x in range(WALL_GRID):
+            row = (y + 1) * CORNER_SPAN
+            corners[wall_slot(x, y, True)] = (row + x, row + x + 1, row + x + 2)
+            column = x + 1
+            corners[wall_slot(x, y, False)] = tuple(
+                (y + step) * CORNER_SPAN + column for step in range(3)
+            )
+    return corners
+
+
+WALL_CORNERS = _build_wall_corners()
+
+# Each wall slot's image under the left-right mirror of the board. Walls block mirrored
+# edges, so distance fields mirror with them, but WALL_CONFLICTS is not symmetric:
+# a position and its mirror image can have different legal walls.
+MIRROR_SLOTS = tuple(
+    wall_slot(WALL_GRID - 1 - x, y, is_horizontal)
+    for x, y, is_horizontal in map(slot_wall, range(WALL_SLOTS))
+)
+
+
+def mirror_walls(walls):
+    mirrored = 0
+    for slot in range(WALL_SLOTS):
+        if walls >> slot & 1:
+            mirrored |= 1 << MIRROR_SLOTS[slot]
+    return mirrored
+
+
 class Board:
     def __init__(self):
-        self.horizontal_walls = [[False for _ in range(BOARD_SIZE - 1)] for _ in range(BOARD_SIZE - 1)]
-        self.vertical_walls = [[False for _ in range(BOARD_SIZE - 1)] for _ in range(BOARD_SIZE - 1)] 
-    
+        self.walls = 0
+        # The wall mask of this board's mirror image, kept in step with walls
+        self.mirrored_walls = 0
+        self.blocked_edges = 0
+        # Per-row copies of blocked_edges, small enough for cheap bit tests
+        self._right_rows = [0] * BOARD_SIZE
+        self._down_rows = [0] * WALL_GRID
+        # Open-edge table: neighbor cell indices reachable from each cell
+        self.neighbors = [[neighbor for neighbor, _ in links] for links in CELL_LINKS]
+        # Known paths as edge masks keyed by (start cell, goal row), valid while none of their edges is blocked
+        self.path_cache = {}
+        self._reset_anchors()
+        # Goal-rooted distance fields, repaired incrementally as walls change
+        self.distances = DistanceFields(self)
+        self._wall_lists = None
+
+    @classmethod
+    def from_walls(cls, walls):
+        board = cls()
+        board._set_walls(walls)
+        return board
+
+    @property
+    def horizontal_walls(self):
+        return self._get_wall_lists()[0]
+
+    @horizontal_walls.setter
+    def horizontal_walls(self, grid):
+        self._set_wall_grid(grid, True)
+
+    @property
+    def vertical_walls(self):
+        return self._get_wall_lists()[1]
+
+    @vertical_walls.setter
+    def vertical_walls(self, grid):
+        self._set_wall_grid(grid, False)
+
+    def _get_wall_lists(self):
+        if self._wall_lists is None:
+            walls = self.walls
+            self._wall_lists = tuple(
+                [[bool(walls >> wall_slot(x, y, is_horizontal) & 1) for x in range(WALL_GRID)]
+                 for y in range(WALL_GRID)]
+                for is_horizontal in (True, False)
+            )
+        return self._wall_lists
+
+    def _set_wall_grid(self, grid, is_horizontal):
+        walls = self.walls
+        for y in range(WALL_GRID):
+            for x in range(WALL_GRID):
+                bit = 1 << wall_slot(x, y, is_horizontal)
+                if grid[y][x]:
+                    walls |= bit
+                else:
+                    walls &= ~bit
+        self._set_walls(walls)
+
+    def _set_walls(self, walls):
+        self.walls = walls
+        self.mirrored_walls = mirror_walls(walls)
+        self.blocked_edges = 0
+        self._right_rows = [0] * BOARD_SIZE
+        self._down_rows = [0] * WALL_GRID
+        self.neighbors = [[neighbor for neighbor, _ in links] for links in CELL_LINKS]
+        self._reset_anchors()
+        for slot in range(WALL_SLOTS):
+            if walls >> slot & 1:
+                for edge in WALL_EDGES[slot]:
+                    self._set_edge(edge, True)
+                self._link_wall(slot)
+        self.distances = DistanceFields(self)
+        self._wall_lists = None
+
+    # Union-find over wall corners, with a trail so the last wall can be unlinked
+    def _reset_anchors(self):
+        self._anchor_parents = list(range(CORNER_COUNT))
+        self._anchor_sizes = [1] * CORNER_COUNT
+        border = BORDER_CORNERS[0]
+        for corner in BORDER_CORNERS:
+            self._anchor_parents[corner] = border
+        self._anchor_sizes[border] = len(BORDER_CORNERS)
+        self._anchor_trail = []
+
+    def _find_anchor(self, corner):
+        parents = self._anchor_parents
+        while parents[corner] != corner:
+            corner = parents[corner]
+        return corner
+
+    def _link_wall(self, slot):
+        sizes = self._anchor_sizes
+        links = []
+        corners = WALL_CORNERS[slot]
+        first = self._find_anchor(corners[0])
+        for corner in corners[1:]:
+            root = self._find_anchor(corner)
+            if root == first:
+                continue
+            if sizes[root] > sizes[first]:
+                root, first = first, root
+            self._anchor_parents[root] = first
+            sizes[first] += sizes[root]
+            links.append(root)
+        self._anchor_trail.append((slot, links))
+
+    def _unlink_wall(self, slot):
+        if not self._anchor_trail or self._anchor_trail[-1][0] != slot:
+            # Not the most recent wall: rebuild the anchors from the remaining walls
+            self._reset_anchors()
+            for other in range(WALL_SLOTS):
+                if self.walls >> other & 1:
+                    self._link_wall(other)
+            return
+
+        _, links = self._anchor_trail.pop()
+        for root in reversed(links):
+            parent = self._anchor_parents[root]
+            self._anchor_sizes[parent] -= self._anchor_sizes[root]
+            self._anchor_parents[root] = root
+
+    # A wall can only cut the board if it joins two points already connected through walls or the border
+    def wall_may_close_loop(self, x, y, is_horizontal):
+        first, middle, last = (self._find_anchor(corner) for corner in WALL_CORNERS[wall_slot(x, y, is_horizontal)])
+        return first == middle or middle == last or first == last
+
+    def _set_edge(self, edge, blocked):
+        if edge < RIGHT_EDGES:
+            rows, (y, x) = self._right_rows, divmod(edge, WALL_GRID)
+        else:
+            rows, (y, x) = self._down_rows, divmod(edge - RIGHT_EDGES, BOARD_SIZE)
+
+        first, second = EDGE_CELLS[edge]
+        if blocked:
+            if self.blocked_edges >> edge & 1:
+                return
+            self.blocked_edges |= 1 << edge
+            rows[y] |= 1 << x
+            self.neighbors[first].remove(second)
+            self.neighbors[second].remove(first)
+        else:
+            self.blocked_edges &= ~(1 << edge)
+            rows[y] &= ~(1 << x)
+            self._refresh_neighbors(first)
+            self._refresh_neighbors(second)
+
+    def _refresh_neighbors(self, cell):
+        blocked = self.blocked_edges
+        self.neighbors[cell] = [neighbor for neighbor, edge in CELL_LINKS[cell] if not blocked >> edge & 1]
+
+    # Path length to goal_row from every cell; callers must not modify it
+    def distance_field(self, goal_row):
+        return self.distances.get(goal_row)
+
+    def has_wall(self, x, y, is_horizontal):
+        return bool(self.walls >> wall_slot(x, y, is_horizontal) & 1)
+
     def is_valid_position(self, x, y):
         return 0 <= x < BOARD_SIZE and 0 <= y < BOARD_SIZE
-    
+
     def can_place_wall(self, x, y, is_horizontal):
-        if not (0 <= x < BOARD_SIZE - 1 and 0 <= y < BOARD_SIZE - 1):
+        if not (0 <= x < WALL_GRID and 0 <= y < WALL_GRID):
             return False
-        
-        if is_horizontal:
-
-            #check if wall already exists
-            if self.horizontal_walls[y][x]:
-                return False
-            
-            #check for overlapping vertical walls
-            if x > 0 and self.vertical_walls[y][x - 1]:
-                return False
-            if x < BOARD_SIZE - 2 and self.vertical_walls[y][x]:
-                return False
-            
-            #check for adjacent horizontal walls
-            if x > 0 and self.horizontal_walls[y][x - 1]:
-                return False
-            if x < BOARD_SIZE - 2 and self.horizontal_walls[y][x + 1]:
-                return False
-        else:
-            #check if wall already exists
-            if self.vertical_walls[y][x]:
-                return False
-            
-            #check for overlapping horizontal walls
-            if y > 0 and self.horizontal_walls[y - 1][x]:
-                return False
-            if y < BOARD_SIZE - 2 and self.horizontal_walls[y][x]:
-                return False
-            
-            #check for adjacent vertical walls
-            if y > 0 and self.vertical_walls[y - 1][x]:
-                return False
-            if y < BOARD_SIZE - 2 and self.vertical_walls[y + 1][x]:
-                return False
-        return True
-    
+        return not self.walls & WALL_CONFLICTS[wall_slot(x, y, is_horizontal)]
+
     def place_wall(self, x, y, is_horizontal):
         if not self.can_place_wall(x, y, is_horizontal):
             return False
-        
-        if is_horizontal:
-            self.horizontal_walls[y][x] = True
-        else:
-            self.vertical_walls[y][x] = True
-        
+
+        slot = wall_slot(x, y, is_horizontal)
+        self.walls |= 1 << slot
+        self.mirrored_walls |= 1 << MIRROR_SLOTS[slot]
+        cut_edges = []
+        for edge in WALL_EDGES[slot]:
+            if not self.blocked_edges >> edge & 1:
+                self._set_edge(edge, True)
+                cut_edges.append(EDGE_CELLS[edge])
+        self._link_wall(slot)
+        self.distances.wall_placed(slot, cut_edges)
+        self._wall_lists = None
+
         return True
-    
+
     #For Undo Functionality
     def remove_wall(self, x, y, is_horizontal):
-        if 0 <= x < BOARD_SIZE - 1 and 0 <= y < BOARD_SIZE - 1:
-            if is_horizontal:
-                self.horizontal_walls[y][x] = False
-            else:
-                self.vertical_walls[y][x] = False
+        if not (0 <= x < WALL_GRID and 0 <= y < WALL_GRID):
+            return
+
+        slot = wall_slot(x, y, is_horizontal)
+        if not self.walls >> slot & 1:
+            return
+
+        self.walls &= ~(1 << slot)
+        self.mirrored_walls &= ~(1 << MIRROR_SLOTS[slot])
+        # Keep edges closed that another wall still covers
+        for edge in WALL_EDGES[slot]:
+            if not self.walls & EDGE_BLOCKERS[edge]:
+                self._set_edge(edge, False)
+        self._unlink_wall(slot)
+        self.distances.wall_removed(slot)
+        self._wall_lists = None
 
     #Checks if path between two adjacent cells is blocked by a wall
     def is_path_blocked(self, x1, y1, x2, y2):
-        # move right
-        if x2 == x1 + 1 and y2 == y1:
-            if x1 < BOARD_SIZE - 1:
-                if y1 > 0 and self.vertical_walls[y1 - 1][x1]:
-                    return True
-                if y1 < BOARD_SIZE - 1 and self.vertical_walls[y1][x1]:
-                    return True
-        # move left
-        elif x2 == x1 - 1 and y2 == y1:
-            if x2 < BOARD_SIZE - 1:
-                if y1 > 0 and self.vertical_walls[y1 - 1][x2]:
-                    return True
-                if y1 < BOARD_SIZE - 1 and self.vertical_walls[y1][x2]:
-                    return True
-        # move down
-        elif x2 == x1 and y2 == y1 + 1:
-            if y1 < BOARD_SIZE - 1:
-                if x1 > 0 and self.horizontal_walls[y1][x1 - 1]:
-                    return True
-                if x1 < BOARD_SIZE - 1 and self.horizontal_walls[y1][x1]:
-                    return True
-        # move up
-        elif x2 == x1 and y2 == y1 - 1:
-            if y2 < BOARD_SIZE - 1:
-                if x1 > 0 and self.horizontal_walls[y2][x1 - 1]:
-                    return True
-                if x1 < BOARD_SIZE - 1 and self.horizontal_walls[y2][x1]:
-                    return True
+        if y1 == y2:
+            if x2 == x1 + 1:
+                return 0 <= x1 < WALL_GRID and 0 <= y1 < BOARD_SIZE and self._right_rows[y1] >> x1 & 1 == 1
+            if x2 == x1 - 1:
+                return 0 <= x2 < WALL_GRID and 0 <= y1 < BOARD_SIZE and self._right_rows[y1] >> x2 & 1 == 1
+        elif x1 == x2:
+            if y2 == y1 + 1:
+                return 0 <= y1 < WALL_GRID and 0 <= x1 < BOARD_SIZE and self._down_rows[y1] >> x1 & 1 == 1
+            if y2 == y1 - 1:
+                return 0 <= y2 < WALL_GRID and 0 <= x1 < BOARD_SIZE and self._down_rows[y2] >> x1 & 1 == 1
         return False
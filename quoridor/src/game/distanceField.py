@@ -0,0 +1,149 @@
+import heapq
+
+from game.fieldCache import FIELD_CACHE
+from util.constants import BOARD_SIZE
+
+CELL_COUNT = BOARD_SIZE * BOARD_SIZE
+# Larger than any real path length, so fields stay plain ints
+UNREACHABLE = CELL_COUNT
+# Each cell's image under the left-right mirror of the board
+MIRROR_CELLS = tuple(y * BOARD_SIZE + BOARD_SIZE - 1 - x for y in range(BOARD_SIZE) for x in range(BOARD_SIZE))
+
+
+# Reverse multi-source BFS from every cell of the goal row
+def compute_distance_field(neighbors, goal_row):
+    field = [UNREACHABLE] * CELL_COUNT
+    frontier = list(range(goal_row * BOARD_SIZE, (goal_row + 1) * BOARD_SIZE))
+    for cell in frontier:
+        field[cell] = 0
+
+    distance = 0
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for current in frontier:
+            for neighbor in neighbors[current]:
+                if field[neighbor] == UNREACHABLE:
+                    field[neighbor] = distance
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+
+    return field
+
+
+class DistanceFields:
+    # Keeps one distance field per goal row in step with the board's neighbor table.
+    # Placing a wall repairs only the cells whose distance changed and records them,
+    # so removing the most recent wall rolls those cells back.
+
+    def __init__(self, board, cache=FIELD_CACHE):
+        self.board = board
+        self.neighbors = board.neighbors
+        self.cache = cache
+        self.fields = {}
+        self._trail = []
+
+    def get(self, goal_row):
+        field = self.fields.get(goal_row)
+        if field is None:
+            field = self._load(goal_row)
+            if field is None:
+                field = compute_distance_field(self.neighbors, goal_row)
+                self._store(goal_row, field)
+            self.fields[goal_row] = field
+        return field
+
+    # Field if it is known without a search, otherwise None
+    def peek(self, goal_row):
+        field = self.fields.get(goal_row)
+        if field is None:
+            field = self._load(goal_row)
+            if field is not None:
+                self.fields[goal_row] = field
+        return field
+
+    # The cache holds one field per mirror pair of wall sets, under the smaller mask;
+    # a board on the other side of the pair reads and writes it mirrored
+    def _load(self, goal_row):
+        board = self.board
+        if board.mirrored_walls < board.walls:
+            cached = self.cache.get(board.mirrored_walls, goal_row)
+            return [cached[cell] for cell in MIRROR_CELLS] if cached is not None else None
+        cached = self.cache.get(board.walls, goal_row)
+        return list(cached) if cached is not None else None
+
+    def _store(self, goal_row, field):
+        board = self.board
+        if board.mirrored_walls < board.walls:
+            self.cache.put(board.mirrored_walls, goal_row, [field[cell] for cell in MIRROR_CELLS])
+        else:
+            self.cache.put(board.walls, goal_row, field)
+
+    def wall_placed(self, slot, cut_edges):
+        changes = {}
+        for goal_row, field in self.fields.items():
+            changes[goal_row] = self._repair(field, cut_edges)
+        self._trail.append((slot, changes))
+
+    def wall_removed(self, slot):
+        if not self._trail or self._trail[-1][0] != slot:
+            # Not the most recent wall: recompute lazily from scratch
+            self.fields = {}
+            self._trail = []
+            return
+
+        _, changes = self._trail.pop()
+        for goal_row in list(self.fields):
+            if goal_row not in changes:
+                # Field was built after this wall went in, so it has nothing to roll back to
+                del self.fields[goal_row]
+                continue
+            field = self.fields[goal_row]
+            for cell, distance in changes[goal_row]:
+                field[cell] = distance
+
+    def _repair(self, field, cut_edges):
+        neighbors = self.neighbors
+
+        # Cells that relied on a cut edge for their shortest path
+        pending = []
+        for first, second in cut_edges:
+            for cell, other in ((first, second), (second, first)):
+                if field[cell] != UNREACHABLE and field[cell] == field[other] + 1:
+                    heapq.heappush(pending, (field[cell], cell))
+
+        # Invalidate, in distance order, every cell left without a neighbor one step closer
+        invalid = {}
+        while pending:
+            distance, cell = heapq.heappop(pending)
+            if cell in invalid:
+                continue
+            if any(field[n] == distance - 1 and n not in invalid for n in neighbors[cell]):
+                continue
+            invalid[cell] = distance
+            for neighbor in neighbors[cell]:
+                if field[neighbor] == distance + 1 and neighbor not in invalid:
+                    heapq.heappush(pending, (distance + 1, neighbor))
+
+        if not invalid:
+            return []
+
+        # Re-seed invalid cells from their still-valid neighbors, then relax among them
+        for cell in invalid:
+            field[cell] = UNREACHABLE
+        for cell in invalid:
+            best = min((field[n] for n in neighbors[cell] if n not in invalid), default=UNREACHABLE)
+            if best < UNREACHABLE - 1:
+                field[cell] = best + 1
+                heapq.heappush(pending, (best + 1, cell))
+
+        while pending:
+            distance, cell = heapq.heappop(pending)
+            if distance != field[cell]:
+                continue
+            for neighbor in neighbors[cell]:
+                if neighbor in invalid and field[neighbor] > distance + 1:
+                    field[neighbor] = distance + 1
+                    heapq.heappush(pending, (distance + 1, neighbor))
+
+        return list(invalid.items())
@@ -0,0 +1,84 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+class FieldCache:
+    # Bounded LRU of distance fields keyed by (wall mask, goal row).
+    # Wall sets change far less often than pawns, so a field computed once can be
+    # reused by any board with the same walls, across turns and games.
+    # Thread-safe: the AI searches on a background thread while the game moves.
+
+    def __init__(self, max_entries=4096, max_bytes=8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, walls, goal_row):
+        key = (walls, goal_row)
+        with self._lock:
+            field = self._entries.get(key)
+            if field is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return field
+
+    def put(self, walls, goal_row, field):
+        key = (walls, goal_row)
+        field = tuple(field)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = field
+            self._bytes += _entry_size(key, field)
+            self._evict()
+
+    def resize(self, max_entries=None, max_bytes=None):
+        if max_entries is not None:
+            self.max_entries = max_entries
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        with self._lock:
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    # Callers hold the lock
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key, field = self._entries.popitem(last=False)
+            self._bytes -= _entry_size(key, field)
+
+
+def _entry_size(key, field):
+    return sys.getsizeof(key) + sys.getsizeof(key[0]) + sys.getsizeof(field)
+
+
+# Process-wide cache shared by every Board
+FIELD_CACHE = FieldCache()
@@ -2,10 +2,37 @@ import json
 import os
 from enum import Enum
 
-from game.board import Board
+from game.board import Board, cell_index
 from game.player import Player
-from game.pathFinding import Position, get_neighbors, has_valid_path
-from util.constants import SAVE_DIR
+from game.pathFinding import POSITIONS, Position, wall_keeps_paths_open
+from util.constants import BOARD_SIZE, SAVE_DIR
+
+# Sideways cell steps around a blocked jump, keyed by the step towards the opponent
+SIDE_STEPS = {
+    dx + dy * BOARD_SIZE: (-dy + dx * BOARD_SIZE, dy - dx * BOARD_SIZE)
+    for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+}
+
+# Cells a pawn on cell can move to with the opponent on opp_cell
+def valid_pawn_cells(neighbors, cell, opp_cell):
+    cells = []
+    # Neighbor lists are already in left, right, up, down order and exclude blocked edges
+    for new_cell in neighbors[cell]:
+        # Handle the unique moves
+        if new_cell == opp_cell:
+            step = new_cell - cell
+            jump_cell = opp_cell + step
+
+            if jump_cell in neighbors[opp_cell]:
+                cells.append(jump_cell)
+            else:
+                for side_step in SIDE_STEPS[step]:
+                    side_cell = opp_cell + side_step
+                    if side_cell in neighbors[opp_cell]:
+                        cells.append(side_cell)
+        else:
+            cells.append(new_cell)
+    return cells
 
 class MoveType(Enum):
     PAWN = "pawn"
@@ -51,6 +78,11 @@ class GameState:
         if mode == "human_vs_ai":
             self.players[1].is_ai = True
     
+    # Compact, picklable copy of the position: wall mask, side to move, winner and pawns
+    def snapshot(self):
+        return (self.board.walls, self.current_player_idx, self.winner,
+                tuple((p.x, p.y, p.walls_remaining) for p in self.players))
+    
     def get_current_player(self):
         return self.players[self.current_player_idx]
     
@@ -65,36 +97,10 @@ class GameState:
         if player is None:
             player = self.get_current_player()
         
-        valid_moves = []
         opponent = self.players[1 - player.player_id]
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-
-        for dx, dy in directions:
-            new_x = player.x + dx
-            new_y = player.y + dy
-
-            if not self.board.is_valid_position(new_x, new_y):
-                continue
-
-            if self.board.is_path_blocked(player.x, player.y, new_x, new_y):
-                continue
-
-            # Handle the unique moves
-            if (new_x, new_y) == (opponent.x, opponent.y):
-                jump_x = opponent.x + dx
-                jump_y = opponent.y + dy
-
-                if self.board.is_valid_position(jump_x, jump_y) and not self.board.is_path_blocked(opponent.x, opponent.y, jump_x, jump_y):
-                    valid_moves.append(Position(jump_x, jump_y))
-                else:
-                    for side_dx, side_dy in [(-dy, dx), (dy, -dx)]:
-                        side_x = opponent.x + side_dx
-                        side_y = opponent.y + side_dy
-                        if self.board.is_valid_position(side_x, side_y) and not self.board.is_path_blocked(opponent.x, opponent.y, side_x, side_y):
-                            valid_moves.append(Position(side_x, side_y))
-            else:
-                valid_moves.append(Position(new_x, new_y))
-        return valid_moves
+        return [POSITIONS[cell] for cell in valid_pawn_cells(self.board.neighbors,
+                                                             cell_index(player.x, player.y),
+                                                             cell_index(opponent.x, opponent.y))]
     
     def move_pawn(self, new_x, new_y):
         player = self.get_current_player()
@@ -137,22 +143,12 @@ class GameState:
             self.message = "Invalid wall placement!"
             return False
         
-        # Temporarily place the wall
-        self.board.place_wall(wall_x, wall_y, is_horizontal)
-        
         # Check for valid paths for both players
-        valid = True
-        for p in self.players:
-            if not has_valid_path(self.board, p.x, p.y, p.goals):
-                valid = False
-                break
-        
-        if not valid:
-            # Remove the wall since it blocks paths
-            self.board.remove_wall(wall_x, wall_y, is_horizontal)
+        if not wall_keeps_paths_open(self.board, self.players, wall_x, wall_y, is_horizontal):
             self.message = "Wall placement blocks path!"
             return False
         
+        self.board.place_wall(wall_x, wall_y, is_horizontal)
         player.place_wall()
         
         # Record move for undo
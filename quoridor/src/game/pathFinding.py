@@ -1,87 +1,130 @@
 from collections import deque
+from game.board import WALL_EDGE_MASKS, cell_index, edge_between, wall_slot
+from game.distanceField import UNREACHABLE
 from util.constants import BOARD_SIZE
 
 class Position:
+    __slots__ = ('x', 'y')
     
     def __init__(self, x, y):
         self.x = x
         self.y = y
     
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, Position):
             return False
         return self.x == other.x and self.y == other.y
     
     def __hash__(self):
-        return hash((self.x, self.y))
+        return self.y * BOARD_SIZE + self.x
     
     def __repr__(self):
         return f"Position({self.x}, {self.y})"
-    
-def get_neighbors(pos, board):
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    neighbors = []
-    for dx, dy in directions:
-        nx, ny = pos.x + dx, pos.y + dy
-        
-        if not board.is_valid_position(nx, ny):
-            continue
-        if board.is_path_blocked(pos.x, pos.y, nx, ny):
-            continue
-
-        neighbors.append(Position(nx, ny))
 
-    return neighbors
+# Interned positions for every cell, indexed by cell_index(x, y)
+POSITIONS = tuple(Position(cell % BOARD_SIZE, cell // BOARD_SIZE)
+                  for cell in range(BOARD_SIZE * BOARD_SIZE))
 
-# Breadth-First Search to check for valid path
-def has_valid_path(board, start_x, start_y, goal_row):
-    if start_y == goal_row:
-        return True
-    
-    visited = set()
-    queue = deque()
-    start = Position(start_x, start_y)
+def position_at(x, y):
+    return POSITIONS[cell_index(x, y)]
     
-    queue.append(start)
-    visited.add(start)
+def get_neighbors(pos, board):
+    return [POSITIONS[cell] for cell in board.neighbors[cell_index(pos.x, pos.y)]]
+
+# Breadth-First Search for a shortest path, returned as a mask of the edges it uses
+def _search_path_edges(board, start, goal_row):
+    neighbors = board.neighbors
+    goal_start = goal_row * BOARD_SIZE
+    goal_end = goal_start + BOARD_SIZE
+    parents = [-1] * (BOARD_SIZE * BOARD_SIZE)
+    parents[start] = start
+    queue = deque([start])
 
     while queue:
         current = queue.popleft()
         
-        if current.y == goal_row:
-            return True
-        
-        for neighbor in get_neighbors(current, board):
-            if neighbor not in visited:
-                visited.add(neighbor)
+        for neighbor in neighbors[current]:
+            if parents[neighbor] < 0:
+                parents[neighbor] = current
+                if goal_start <= neighbor < goal_end:
+                    path = 0
+                    while neighbor != start:
+                        path |= 1 << edge_between(neighbor, parents[neighbor])
+                        neighbor = parents[neighbor]
+                    return path
                 queue.append(neighbor)
     
-    return False
+    return None
 
-def find_shortest_path(board, start_x, start_y, goal_row):
+def get_path_edges(board, start_x, start_y, goal_row):
     if start_y == goal_row:
         return 0
-    
-    visited = set()
-    queue = deque()
-    distances = deque()
-    start = Position(start_x, start_y)
-    
-    queue.append(start)
-    distances.append(0)
-    visited.add(start)
 
-    while queue:
-        current = queue.popleft()
-        distance = distances.popleft()
-        
-        if current.y == goal_row:
-            return distance
-        
-        for neighbor in get_neighbors(current, board):
-            if neighbor not in visited:
-                visited.add(neighbor)
-                queue.append(neighbor)
-                distances.append(distance + 1)
-    
-    return float('inf') # No path found
\ No newline at end of file
+    key = (cell_index(start_x, start_y), goal_row)
+    path = board.path_cache.get(key)
+    if path is not None and not path & board.blocked_edges:
+        return path
+
+    path = _search_path_edges(board, key[0], goal_row)
+    if path is not None:
+        # At most one entry per (start cell, goal row), so the cache needs no bound
+        board.path_cache[key] = path
+    return path
+
+# Edges of the shortest path found by walking down the goal row's distance field.
+# Unlike get_path_edges, the path depends only on the walls, not on cache history.
+def field_path_edges(board, start_x, start_y, goal_row):
+    field = board.distance_field(goal_row)
+    neighbors = board.neighbors
+    cell = cell_index(start_x, start_y)
+    if field[cell] == UNREACHABLE:
+        return None
+
+    path = 0
+    while field[cell]:
+        closer = field[cell] - 1
+        for neighbor in neighbors[cell]:
+            if field[neighbor] == closer:
+                break
+        path |= 1 << edge_between(cell, neighbor)
+        cell = neighbor
+    return path
+
+def has_valid_path(board, start_x, start_y, goal_row):
+    # A known distance field answers reachability without any search
+    field = board.distances.peek(goal_row)
+    if field is not None:
+        return field[cell_index(start_x, start_y)] != UNREACHABLE
+    return get_path_edges(board, start_x, start_y, goal_row) is not None
+
+def find_shortest_path(board, start_x, start_y, goal_row):
+    distance = board.distance_field(goal_row)[cell_index(start_x, start_y)]
+    if distance == UNREACHABLE:
+        return float('inf') # No path found
+    return distance
+
+# Assumes both players can currently reach their goals; only players whose
+# cached path crosses the new wall need a fresh search
+def wall_keeps_paths_open(board, players, wall_x, wall_y, is_horizontal):
+    if not board.wall_may_close_loop(wall_x, wall_y, is_horizontal):
+        return True
+
+    wall_edges = WALL_EDGE_MASKS[wall_slot(wall_x, wall_y, is_horizontal)]
+    severed = []
+    for p in players:
+        path = get_path_edges(board, p.x, p.y, p.goals)
+        if path is None:
+            return False
+        if path & wall_edges:
+            severed.append(p)
+
+    if not severed:
+        return True
+
+    if not board.place_wall(wall_x, wall_y, is_horizontal):
+        return False
+    valid = all(has_valid_path(board, p.x, p.y, p.goals) for p in severed)
+    board.remove_wall(wall_x, wall_y, is_horizontal)
+    return valid
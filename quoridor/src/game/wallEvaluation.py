@@ -0,0 +1,159 @@
+from game.board import (
+    EDGE_COUNT, RIGHT_EDGES, WALL_CONFLICTS, WALL_EDGE_MASKS, WALL_EDGES, WALL_GRID, WALL_SLOTS, slot_wall
+)
+from game.distanceField import UNREACHABLE
+from game.pathFinding import field_path_edges, find_shortest_path, wall_keeps_paths_open
+from util.constants import BOARD_SIZE
+
+try:
+    import numpy as np
+except ImportError:  # Optional: fall back to one place/measure/remove per slot
+    np = None
+
+
+# Legality of every wall slot and each player's path-length change if it were placed.
+# Returns (legal, deltas) indexed by wall slot; deltas[slot][player_id] is 0 for illegal slots.
+# With slots given, only those are evaluated and every other slot reads as illegal.
+def evaluate_walls(board, players, slots=None):
+    if slots is None:
+        slots = range(WALL_SLOTS)
+    if np is None:
+        return _evaluate_walls_serial(board, players, slots)
+    return _evaluate_walls_batched(board, players, slots)
+
+
+# Best wall slots for player_id, at most budget of them: walls cutting the opponent's
+# shortest path (the only ones that can lengthen it) and walls occupying slots the
+# opponent could use to cut ours, ranked by opponent delta minus own delta.
+# With prune_quiet, walls that change neither path are left out.
+def rank_walls(board, players, player_id, budget, prune_quiet=False):
+    player = players[player_id]
+    opponent = players[1 - player_id]
+    opp_path = field_path_edges(board, opponent.x, opponent.y, opponent.goals) or 0
+    my_path = field_path_edges(board, player.x, player.y, player.goals) or 0
+
+    walls = board.walls
+    attacks = []
+    threats = 0
+    for slot in range(WALL_SLOTS):
+        if walls & WALL_CONFLICTS[slot]:
+            continue
+        edges = WALL_EDGE_MASKS[slot]
+        if edges & opp_path:
+            attacks.append(slot)
+        if edges & my_path:
+            threats |= WALL_CONFLICTS[slot]
+    guards = [
+        slot for slot in range(WALL_SLOTS)
+        if threats >> slot & 1 and not WALL_EDGE_MASKS[slot] & (my_path | opp_path)
+        and not walls & WALL_CONFLICTS[slot]
+    ]
+
+    candidates = attacks + guards
+    legal, deltas = evaluate_walls(board, players, candidates)
+    scored = []
+    for slot in candidates:
+        delta = deltas[slot]
+        if legal[slot] and not (prune_quiet and not any(delta)):
+            scored.append((delta[opponent.player_id] - delta[player_id], slot))
+    scored.sort(key=lambda item: -item[0])
+
+    return [slot for _, slot in scored[:budget]]
+
+
+def _evaluate_walls_serial(board, players, slots):
+    legal = [False] * WALL_SLOTS
+    deltas = [[0] * len(players) for _ in range(WALL_SLOTS)]
+    before = [find_shortest_path(board, p.x, p.y, p.goals) for p in players]
+
+    for slot in slots:
+        x, y, is_horizontal = slot_wall(slot)
+        if not board.can_place_wall(x, y, is_horizontal):
+            continue
+        if not wall_keeps_paths_open(board, players, x, y, is_horizontal):
+            continue
+
+        legal[slot] = True
+        board.place_wall(x, y, is_horizontal)
+        for i, p in enumerate(players):
+            deltas[slot][i] = find_shortest_path(board, p.x, p.y, p.goals) - before[i]
+        board.remove_wall(x, y, is_horizontal)
+
+    return legal, deltas
+
+
+def _edge_grids(edge_bits):
+    # Split a per-edge array into (rows, cols) grids of right and down edges
+    right = edge_bits[..., :RIGHT_EDGES].reshape(edge_bits.shape[:-1] + (BOARD_SIZE, WALL_GRID))
+    down = edge_bits[..., RIGHT_EDGES:].reshape(edge_bits.shape[:-1] + (WALL_GRID, BOARD_SIZE))
+    return right, down
+
+
+def _mask_bits(mask):
+    raw = np.frombuffer(mask.to_bytes((EDGE_COUNT + 7) // 8, 'little'), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder='little')[:EDGE_COUNT].astype(bool)
+
+
+_SLOT_BLOCKS = None
+
+
+def _slot_blocks():
+    global _SLOT_BLOCKS
+    if _SLOT_BLOCKS is None:
+        blocks = np.zeros((WALL_SLOTS, EDGE_COUNT), dtype=bool)
+        for slot, edges in enumerate(WALL_EDGES):
+            blocks[slot, list(edges)] = True
+        _SLOT_BLOCKS = _edge_grids(blocks)
+    return _SLOT_BLOCKS
+
+
+def _evaluate_walls_batched(board, players, slots):
+    legal = np.zeros(WALL_SLOTS, dtype=bool)
+    deltas = np.zeros((WALL_SLOTS, len(players)), dtype=np.int64)
+
+    walls = board.walls
+    slots = np.array([slot for slot in slots if not walls & WALL_CONFLICTS[slot]], dtype=np.intp)
+    current = np.array([board.distance_field(p.goals) for p in players], dtype=np.int16)
+    current = current.reshape(len(players), BOARD_SIZE, BOARD_SIZE)
+    before = np.array([current[i, p.y, p.x] for i, p in enumerate(players)])
+    if not len(slots) or (before >= UNREACHABLE).any():
+        return legal, deltas
+
+    # A slot can only change a field if it cuts an edge lying on some shortest path
+    slot_right, slot_down = _slot_blocks()
+    base_right, base_down = _edge_grids(~_mask_bits(board.blocked_edges))
+    tight_right = (np.abs(current[:, :, 1:] - current[:, :, :-1]) == 1) & base_right
+    tight_down = (np.abs(current[:, 1:, :] - current[:, :-1, :]) == 1) & base_down
+    cuts = ((slot_right[slots][:, None] & tight_right).any(axis=(2, 3)) |
+            (slot_down[slots][:, None] & tight_down).any(axis=(2, 3))).any(axis=1)
+    legal[slots[~cuts]] = True
+    slots = slots[cuts]
+    if not len(slots):
+        return legal, deltas
+
+    # Open edges on one board per remaining slot: (slots, 1, rows, cols), broadcast over players
+    right = (base_right & ~slot_right[slots])[:, None]
+    down = (base_down & ~slot_down[slots])[:, None]
+
+    # Distance fields for every (slot, player), relaxed in place from the goal rows until stable
+    fields = np.full((len(slots), len(players), BOARD_SIZE, BOARD_SIZE), UNREACHABLE, dtype=np.int16)
+    for i, p in enumerate(players):
+        fields[:, i, p.goals, :] = 0
+
+    total = int(fields.sum())
+    while True:
+        np.minimum(fields[..., :, :-1], np.where(right, fields[..., :, 1:] + 1, UNREACHABLE), out=fields[..., :, :-1])
+        np.minimum(fields[..., :, 1:], np.where(right, fields[..., :, :-1] + 1, UNREACHABLE), out=fields[..., :, 1:])
+        np.minimum(fields[..., :-1, :], np.where(down, fields[..., 1:, :] + 1, UNREACHABLE), out=fields[..., :-1, :])
+        np.minimum(fields[..., 1:, :], np.where(down, fields[..., :-1, :] + 1, UNREACHABLE), out=fields[..., 1:, :])
+        relaxed_total = int(fields.sum())
+        if relaxed_total == total:
+            break
+        total = relaxed_total
+
+    after = np.stack([fields[:, i, p.y, p.x] for i, p in enumerate(players)], axis=1).astype(np.int64)
+    reachable = (after < UNREACHABLE).all(axis=1)
+
+    legal[slots] = reachable
+    deltas[slots] = np.where(reachable[:, None], after - before, 0)
+    return legal, deltas
@@ -27,3 +27,14 @@ MENU_HEIGHT = 500
 
 # Animation
 AI_DELAY_MS = 500  # Delay before AI move for better UX
+
+# Hard AI search budget
+HARD_AI_MAX_DEPTH = 6
+HARD_AI_TIME_LIMIT = 2.0  # Seconds per move
+# Processes for the root split; 1 searches in this process and keeps the table,
+# killers and history between moves. Raise only once the split is benchmarked.
+HARD_AI_WORKERS = 1
+
+# MCTS AI budget
+MCTS_AI_TIME_LIMIT = 2.0  # Seconds per move
+MCTS_AI_WORKERS = 1  # Independent trees grown in parallel; not yet benchmarked
@@ -1,4 +1,6 @@
+import logging
 import pygame
+import threading
 import time
 
 from game.gameState import GameState
@@ -8,7 +10,8 @@ from gui.constants import (
     COLOR_BACKGROUND, COLOR_BUTTON, COLOR_BUTTON_HOVER, COLOR_TEXT,
     COLOR_TEXT_DARK, COLOR_TEXT_GRAY, COLOR_PLAYER1, COLOR_PLAYER2,
     FONT_TITLE, FONT_MEDIUM, FONT_SMALL, FONT_BUTTON,
-    AI_DELAY_MS, BUTTON_WIDTH, BUTTON_HEIGHT
+    AI_DELAY_MS, BUTTON_WIDTH, BUTTON_HEIGHT, HARD_AI_MAX_DEPTH, HARD_AI_TIME_LIMIT,
+    HARD_AI_WORKERS, MCTS_AI_TIME_LIMIT, MCTS_AI_WORKERS
 )
 from util.constants import (
     BOARD_SIZE, CELL_SIZE, WALL_THICKNESS, SIDEBAR_WIDTH, WINDOW_WIDTH, WINDOW_HEIGHT
@@ -16,6 +19,13 @@ from util.constants import (
 from ai.easy_ai import EasyAI
 from ai.medium_ai import MediumAI
 from ai.hard_ai import HardAI
+from ai.mcts_ai import MCTSAI
+from ai.searchState import SearchState
+
+# Posted by the AI thread with the chosen move and the id of the search that produced it
+AI_MOVE_EVENT = pygame.USEREVENT + 1
+# Move posted in place of a real one when the search raised
+AI_SEARCH_FAILED = object()
 
 class GameScreen:
     
@@ -35,12 +45,22 @@ class GameScreen:
             elif difficulty == "medium":
                 self.ai_player = MediumAI(1)
             elif difficulty == "hard":
-                self.ai_player = HardAI(1)
+                self.ai_player = HardAI(1, depth=HARD_AI_MAX_DEPTH, time_limit=HARD_AI_TIME_LIMIT,
+                                        workers=HARD_AI_WORKERS)
+            elif difficulty == "mcts":
+                self.ai_player = MCTSAI(1, playouts=None, time_limit=MCTS_AI_TIME_LIMIT,
+                                        workers=MCTS_AI_WORKERS)
         
         # UI state
         self.return_to_menu = False
         self.ai_thinking = False
         self.ai_move_time = 0
+        self._ai_thread = None
+        self._ai_search_id = 0
+        self._ai_move = None
+        self._ai_move_ready = False
+        # Set when a search raised; the AI stays idle until undo, redo, reset or load
+        self.ai_failed = False
         
         # Create buttons
         self.buttons = self._create_buttons()
@@ -152,12 +172,15 @@ class GameScreen:
         return None
     
     def handle_reset(self):
+        self.cancel_ai_turn()
         self.game_state.reset_game()
     
     def handle_undo(self):
+        self.cancel_ai_turn()
         self.game_state.undo()
     
     def handle_redo(self):
+        self.cancel_ai_turn()
         self.game_state.redo()
     
     def handle_save(self):
@@ -182,6 +205,7 @@ class GameScreen:
             root.destroy()
             
             if filename:
+                self.cancel_ai_turn()
                 self.game_state.load_game(filename)
             else:
                 self.game_state.message = "Load cancelled"
@@ -189,6 +213,7 @@ class GameScreen:
             self.game_state.message = f"Error loading: {str(e)}"
     
     def handle_menu(self):
+        self.cancel_ai_turn()
         self.return_to_menu = True
     
     def handle_key_press(self, key):
@@ -207,23 +232,37 @@ class GameScreen:
     
     def process_ai_turn(self):
         if self.game_state.winner is not None:
+            # The human's winning move ends any ponder still running
+            if self._ai_thread is not None:
+                self.cancel_ai_turn()
             return
         
         current_player = self.game_state.get_current_player()
-        if not current_player.is_ai:
+        if not current_player.is_ai or self.ai_failed:
             return
         
+        # Search in the background from the moment the turn starts, overlapping the delay
         if not self.ai_thinking:
+            self.cancel_ai_turn()  # Stops pondering; its results stay with the AI
             self.ai_thinking = True
             self.ai_move_time = pygame.time.get_ticks()
+            self._start_ai_search()
             return
         
         # Wait for delay
-        if pygame.time.get_ticks() - self.ai_move_time < AI_DELAY_MS:
+        if pygame.time.get_ticks() - self.ai_move_time < AI_DELAY_MS or not self._ai_move_ready:
             return
         
-        # Get and execute AI move
-        ai_move = self.ai_player.get_move(self.game_state)
+        # Execute AI move
+        ai_move = self._ai_move
+        self._ai_thread = None
+        self._ai_move = None
+        self._ai_move_ready = False
+        if ai_move is AI_SEARCH_FAILED:
+            self.ai_failed = True
+            self.ai_thinking = False
+            self.game_state.message = "AI error! Undo, reset or load to continue"
+            return
         if ai_move:
             if ai_move.type.value == "pawn":
                 self.game_state.move_pawn(ai_move.x, ai_move.y)
@@ -231,6 +270,52 @@ class GameScreen:
                 self.game_state.place_wall(ai_move.x, ai_move.y, ai_move.is_horizontal)
         
         self.ai_thinking = False
+        if self.game_state.winner is None and not self.game_state.get_current_player().is_ai:
+            self._start_ai_ponder()
+    
+    def _start_ai_search(self):
+        # The thread only sees a copy, so the live game can change while it thinks
+        position = SearchState.from_game_state(self.game_state)
+        search_id = self._ai_search_id
+        ai_player = self.ai_player
+        ai_player.prepare_cancel()
+        
+        # Always post a result, so a failed search cannot leave the turn waiting forever
+        def search():
+            try:
+                move = ai_player.get_move(position)
+            except Exception:
+                logging.exception("AI search failed")
+                move = AI_SEARCH_FAILED
+            pygame.event.post(pygame.event.Event(AI_MOVE_EVENT, search_id=search_id, move=move))
+        
+        self._ai_thread = threading.Thread(target=search, daemon=True)
+        self._ai_thread.start()
+    
+    # Let the AI think on the human's turn until cancel_ai_turn stops it
+    def _start_ai_ponder(self):
+        position = SearchState.from_game_state(self.game_state)
+        ai_player = self.ai_player
+        ai_player.prepare_cancel()
+        self._ai_thread = threading.Thread(target=ai_player.ponder, args=(position,), daemon=True)
+        self._ai_thread.start()
+    
+    # Stop a search or ponder in flight; a search's move is ignored when it arrives
+    def cancel_ai_turn(self):
+        self._ai_search_id += 1
+        if self._ai_thread is not None:
+            self.ai_player.cancel()
+            self._ai_thread.join()
+            self._ai_thread = None
+        self._ai_move = None
+        self._ai_move_ready = False
+        self.ai_thinking = False
+        self.ai_failed = False
+    
+    def _receive_ai_move(self, event):
+        if event.search_id == self._ai_search_id:
+            self._ai_move = event.move
+            self._ai_move_ready = True
     
     def handle_event(self, event):
         # Check buttons first
@@ -238,7 +323,9 @@ class GameScreen:
             if button.handle_event(event):
                 return
         
-        if event.type == pygame.MOUSEBUTTONDOWN:
+        if event.type == AI_MOVE_EVENT:
+            self._receive_ai_move(event)
+        elif event.type == pygame.MOUSEBUTTONDOWN:
             self.handle_mouse_click(event.pos)
         elif event.type == pygame.MOUSEMOTION:
             self.handle_mouse_move(event.pos)
@@ -291,6 +378,14 @@ class GameScreen:
         pygame.display.flip()
     
     def run(self):
+        try:
+            return self._run_loop()
+        finally:
+            if self.ai_player:
+                self.cancel_ai_turn()
+                self.ai_player.close()
+    
+    def _run_loop(self):
         clock = pygame.time.Clock()
         running = True
         
@@ -43,7 +43,8 @@ class MenuScreen:
             ("2 Players", "human_vs_human", None),
             ("Player vs AI (Easy)", "human_vs_ai", "easy"),
             ("Player vs AI (Medium)", "human_vs_ai", "medium"),
-            ("Player vs AI (Hard)", "human_vs_ai", "hard")
+            ("Player vs AI (Hard)", "human_vs_ai", "hard"),
+            ("Player vs AI (MCTS)", "human_vs_ai", "mcts")
         ]
         
         start_y = 200
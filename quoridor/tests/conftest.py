@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules import from src/ (e.g. "from game.board import Board")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
@@ -0,0 +1,93 @@
+import random
+
+from game.board import WALL_CONFLICTS, WALL_EDGES, WALL_GRID, WALL_SLOTS, Board, cell_index, slot_wall, wall_slot
+from game.distanceField import UNREACHABLE, compute_distance_field
+from game.pathFinding import wall_keeps_paths_open
+from ai.searchState import SearchPawn
+from util.constants import BOARD_SIZE, PLAYER_GOALS
+
+
+# The original list-based placement rules that the conflict masks encode
+def _baseline_can_place(walls, x, y, is_horizontal):
+    def has(wx, wy, horizontal):
+        return bool(walls >> wall_slot(wx, wy, horizontal) & 1)
+
+    last = WALL_GRID - 1
+    if is_horizontal:
+        return not (has(x, y, True) or (x > 0 and has(x - 1, y, False)) or (x < last and has(x, y, False))
+                    or (x > 0 and has(x - 1, y, True)) or (x < last and has(x + 1, y, True)))
+    return not (has(x, y, False) or (y > 0 and has(x, y - 1, True)) or (y < last and has(x, y, True))
+                or (y > 0 and has(x, y - 1, False)) or (y < last and has(x, y + 1, False)))
+
+
+def _random_walls(rng, count):
+    board = Board()
+    for _ in range(count):
+        board.place_wall(*slot_wall(rng.randrange(WALL_SLOTS)))
+    return board
+
+
+def _free_slots(board):
+    return [slot for slot in range(WALL_SLOTS) if not board.walls & WALL_CONFLICTS[slot]]
+
+
+def _blocked_edges(walls):
+    blocked = 0
+    for slot in range(WALL_SLOTS):
+        if walls >> slot & 1:
+            for edge in WALL_EDGES[slot]:
+                blocked |= 1 << edge
+    return blocked
+
+
+def _all_reach(board, players):
+    return all(compute_distance_field(board.neighbors, p.goals)[cell_index(p.x, p.y)] < UNREACHABLE
+               for p in players)
+
+
+def test_conflict_masks_match_baseline_rules():
+    rng = random.Random(1)
+    for _ in range(200):
+        board = _random_walls(rng, rng.randrange(15))
+        for slot in range(WALL_SLOTS):
+            assert board.can_place_wall(*slot_wall(slot)) == _baseline_can_place(board.walls, *slot_wall(slot))
+
+
+def test_place_and_remove_keep_edges_and_fields_exact():
+    rng = random.Random(2)
+    for _ in range(40):
+        board = Board()
+        placed = []
+        for _ in range(40):
+            if placed and rng.random() < 0.4:
+                # Mostly the last wall (rolled back), sometimes an older one (rebuilt)
+                index = -1 if rng.random() < 0.7 else rng.randrange(len(placed))
+                board.remove_wall(*slot_wall(placed.pop(index)))
+            else:
+                free = _free_slots(board)
+                if not free:
+                    continue
+                slot = rng.choice(free)
+                board.place_wall(*slot_wall(slot))
+                placed.append(slot)
+
+            fresh = Board.from_walls(board.walls)
+            assert board.blocked_edges == _blocked_edges(board.walls)
+            assert [sorted(cells) for cells in board.neighbors] == [sorted(cells) for cells in fresh.neighbors]
+            for goal_row in PLAYER_GOALS:
+                assert board.distance_field(goal_row) == compute_distance_field(fresh.neighbors, goal_row)
+            for slot in _free_slots(board):
+                assert board.wall_may_close_loop(*slot_wall(slot)) == fresh.wall_may_close_loop(*slot_wall(slot))
+
+
+def test_wall_keeps_paths_open_matches_brute_force():
+    rng = random.Random(3)
+    for _ in range(60):
+        board = _random_walls(rng, rng.randrange(25))
+        players = [SearchPawn(0, rng.randrange(BOARD_SIZE), rng.randrange(WALL_GRID), 10),
+                   SearchPawn(1, rng.randrange(BOARD_SIZE), rng.randrange(1, BOARD_SIZE), 10)]
+        if not _all_reach(board, players):
+            continue
+        for slot in _free_slots(board):
+            expected = _all_reach(Board.from_walls(board.walls | 1 << slot), players)
+            assert wall_keeps_paths_open(board, players, *slot_wall(slot)) == expected
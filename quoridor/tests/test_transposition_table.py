@@ -0,0 +1,38 @@
+import random
+
+from ai.hard_ai import MOVE_CODES
+from ai.transpositionTable import (
+    EXACT, LOWER, NO_MOVE, UPPER, SharedTranspositionTable, TranspositionTable, _pack, _unpack
+)
+
+
+def test_pack_round_trip():
+    rng = random.Random(5)
+    for _ in range(5000):
+        depth = rng.randrange(-1, 100)
+        value = rng.randrange(-10 ** 6, 10 ** 6 + 1)
+        flag = rng.choice((EXACT, LOWER, UPPER))
+        move = rng.randrange(NO_MOVE, MOVE_CODES)
+        assert _unpack(_pack(depth, value, flag, move, rng.randrange(256))) == (depth, value, flag, move)
+
+
+def test_shared_table_matches_local_table():
+    rng = random.Random(6)
+    local = TranspositionTable(8)
+    shared = SharedTranspositionTable(8)
+    try:
+        for generation in range(3):
+            local.new_search()
+            shared.new_search()
+            for _ in range(2000):
+                key = rng.getrandbits(64)
+                if rng.random() < 0.5:
+                    args = (key, rng.randrange(20), rng.randrange(-10000, 10001),
+                            rng.choice((EXACT, LOWER, UPPER)), rng.randrange(NO_MOVE, MOVE_CODES))
+                    local.store(*args)
+                    shared.store(*args)
+                assert shared.probe(key) == local.probe(key)
+                assert shared.best_move(key) == local.best_move(key)
+    finally:
+        shared.close()
+        shared.unlink()
@@ -0,0 +1,26 @@
+import random
+
+import pytest
+
+from ai.searchState import SearchPawn
+from game import wallEvaluation
+from game.board import WALL_GRID, WALL_SLOTS, Board, slot_wall
+from util.constants import BOARD_SIZE
+
+pytest.importorskip("numpy")
+
+
+def test_batched_matches_serial():
+    rng = random.Random(4)
+    for _ in range(30):
+        board = Board()
+        for _ in range(rng.randrange(20)):
+            board.place_wall(*slot_wall(rng.randrange(WALL_SLOTS)))
+        players = [SearchPawn(0, rng.randrange(BOARD_SIZE), rng.randrange(WALL_GRID), 10),
+                   SearchPawn(1, rng.randrange(BOARD_SIZE), rng.randrange(1, BOARD_SIZE), 10)]
+        slots = rng.sample(range(WALL_SLOTS), rng.randrange(1, WALL_SLOTS))
+        for subset in (range(WALL_SLOTS), slots):
+            serial_legal, serial_deltas = wallEvaluation._evaluate_walls_serial(board, players, subset)
+            legal, deltas = wallEvaluation._evaluate_walls_batched(board, players, subset)
+            assert list(legal) == serial_legal
+            assert [list(delta) for delta in deltas] == serial_deltas